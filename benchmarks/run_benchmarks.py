@@ -0,0 +1,161 @@
+"""Benchmark each stage of the author search on synthetic corpora
+
+    python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000 -o bench.json
+    python -m benchmarks.run_benchmarks --sizes 10000 --compare bench.json
+
+Ingestion (streaming parse and compile), filtering, aggregation, ranking and
+export are timed separately for each corpus size, with their throughput and
+peak RSS. Results are saved as JSON so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from openalex_author_search import (
+    EXPORT_FORMATS, SORT_KEYS, aggregate_author_profiles, build_results, compile_corpus,
+    export_results, filter_works, iter_results, iter_works
+)
+from benchmarks.synthetic_works import generate_works, write_works
+
+# (topic, journal, country) filters timed in the filtering stage
+FILTER_QUERIES = [
+    ('neural', None, None),
+    (None, 'journal of quantum', None),
+    (None, None, 'united states'),
+    ('cancer', None, 'de')
+]
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter where supported (Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    """Peak resident set size since the last reset (or process start)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def timed(stage, n_works, items, unit, func, *args):
+    """Run func once, returning its result and a result record"""
+    reset_peak_rss()
+    start = time.perf_counter()
+    value = func(*args)
+    seconds = time.perf_counter() - start
+    record = {
+        'n_works': n_works,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'items': items(value) if callable(items) else items,
+        'unit': unit,
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+    record['throughput'] = round(record['items'] / seconds, 1) if seconds else None
+    print(f"{n_works:>9,} works  {stage:<12} {seconds:9.3f}s  "
+          f"{record['throughput'] or 0:>14,.0f} {unit}/s  {record['peak_rss_mb']:>9,.1f} MB peak", flush=True)
+    return value, record
+
+def corpus_file(data_dir, n_works, seed):
+    """Path of the synthetic export for a size, generated on first use"""
+    path = os.path.join(data_dir, f"works_{n_works}_{seed}.json")
+    if not os.path.exists(path):
+        print(f"Generating {n_works:,} synthetic works...", flush=True)
+        write_works(path, generate_works(n_works, seed=seed))
+    return path
+
+def run_size(path, n_works):
+    records = []
+    
+    def ingest():
+        with open(path, 'rb') as f:
+            return compile_corpus(iter_works(f))
+    corpus, record = timed('ingestion', n_works, n_works, 'works', ingest)
+    records.append(record)
+    
+    def filter_all():
+        return [filter_works(corpus, *query) for query in FILTER_QUERIES]
+    _, record = timed('filtering', n_works, n_works * len(FILTER_QUERIES), 'works', filter_all)
+    records.append(record)
+    
+    work_ids = filter_works(corpus)
+    profiles, record = timed('aggregation', n_works, n_works, 'works',
+                             aggregate_author_profiles, corpus, work_ids)
+    records.append(record)
+    
+    def rank_all():
+        return [build_results(profiles, 3, None, sort_by, 50) for sort_by in SORT_KEYS]
+    _, record = timed('ranking', n_works, len(profiles) * len(SORT_KEYS), 'profiles', rank_all)
+    records.append(record)
+    
+    for file_format in EXPORT_FORMATS:
+        def export():
+            return export_results(iter_results(profiles, 1, None, 'Count', None), file_format)
+        _, record = timed(f'export_{file_format}', n_works, len(profiles), 'rows', export)
+        records.append(record)
+    
+    return records
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(records, previous_path):
+    """Print the speed-up of each stage against a previous results file"""
+    with open(previous_path) as f:
+        previous = {(r['n_works'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {previous_path} (>1 is faster now):")
+    for record in records:
+        before = previous.get((record['n_works'], record['stage']))
+        if before and record['seconds']:
+            print(f"{record['n_works']:>9,} works  {record['stage']:<12} {before['seconds'] / record['seconds']:6.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run_benchmarks', description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="corpus sizes in works (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'author_search_bench'),
+                        help="where generated exports are kept between runs (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="save the results to this JSON file")
+    parser.add_argument('--compare', help="previous results JSON file to compare against")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.data_dir, exist_ok=True)
+    records = []
+    for n_works in args.sizes:
+        records += run_size(corpus_file(args.data_dir, n_works, args.seed), n_works)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'seed': args.seed,
+                'results': records
+            }, f, indent=2)
+    if args.compare:
+        compare(records, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Seeded generator of realistic OpenAlex-shaped works for benchmarks
+
+Works follow the shape of the Excel JSON export: a top-level array of works
+with cited_by_count, primary_location.source, primary_topic and authorships.
+Team sizes are mostly small with a long tail and a fraction of hyper-authored
+(1,000+ author) papers; author popularity is skewed so that some authors have
+many works; names carry accents, dash variants and irregular whitespace, and
+some works miss primary_location, source or primary_topic.
+"""
+import json
+import random
+import unicodedata
+
+FIRST_NAMES = [
+    'José', 'María', 'François', 'Zoë', 'Jürgen', 'Søren', 'Łukasz', 'Ángel', 'Chloé', 'Björn',
+    'Anna', 'Wei', 'Li', 'Hiroshi', 'Priya', 'Ahmed', 'Olga', 'James', 'Sarah', 'Kwame',
+    'Jean‐Luc', 'Anne‑Marie', 'Nguyễn', 'İlker', 'Dvořák', 'Ines', 'Mehmet', 'Sofía', 'Ngozi', 'Yuki'
+]
+LAST_NAMES = [
+    'García', 'Müller', 'Schröder', 'Ødegaard', 'Kowalski', 'Nuñez', 'Çelik', 'Smith', 'Chen', 'Wang',
+    'Tanaka', 'Patel', 'Okafor', 'Ivanova', 'Johnson', 'Brown', 'Lefèvre', 'Núñez–Pérez', 'O’Brien',
+    'Van der Berg', 'Kim', 'Lee', 'Nguyen', 'Rossi', 'Silva', 'Santos', 'Fischer', 'Novák', 'Dubois', 'Haddad'
+]
+TOPIC_WORDS = [
+    'Neural', 'Quantum', 'Genomic', 'Climate', 'Protein', 'Cancer', 'Graph', 'Particle', 'Soil', 'Ocean',
+    'Immune', 'Language', 'Market', 'Urban', 'Cardiac', 'Robotic', 'Viral', 'Catalytic', 'Galactic', 'Social'
+]
+TOPIC_SUBJECTS = [
+    'Networks', 'Dynamics', 'Signaling', 'Modeling', 'Imaging', 'Therapy', 'Optimization', 'Detection',
+    'Ecology', 'Metabolism', 'Learning', 'Policy', 'Transport', 'Materials', 'Genetics'
+]
+# Relative frequency of authorship country codes, including a few
+# lowercase and unknown codes as seen in real exports
+COUNTRY_WEIGHTS = {
+    'US': 30, 'CN': 22, 'GB': 8, 'DE': 7, 'JP': 5, 'FR': 5, 'IN': 5, 'CA': 4, 'IT': 4, 'AU': 3,
+    'BR': 3, 'KR': 3, 'ES': 3, 'NL': 2, 'CH': 2, 'SE': 2, 'ZA': 1, 'NG': 1, 'MX': 1, 'TR': 1,
+    'us': 1, 'gb': 1, 'XX': 1
+}
+
+def _fold(name):
+    return unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('ascii')
+
+def _make_author(rng, index):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    middle = rng.choice(['', '', '', 'A. ', 'J. ', 'M.  '])
+    return {
+        'display_name': f"{first} {middle}{last}",
+        'id': f"https://openalex.org/A{5000000000 + index}",
+        'orcid': f"https://orcid.org/0000-0002-{index // 10000:04d}-{index % 10000:04d}" if rng.random() < 0.6 else None
+    }
+
+def _team_size(rng, hyper_fraction, hyper_authors):
+    if rng.random() < hyper_fraction:
+        return rng.randint(*hyper_authors)
+    return min(1 + int(rng.expovariate(1 / 4)), 200)
+
+def generate_works(n_works, seed=0, n_authors=None, hyper_fraction=0.001, hyper_authors=(1000, 3000),
+                   missing_location_fraction=0.05, missing_topic_fraction=0.05, country_weights=None):
+    """Yield n_works synthetic works, deterministically for a given seed"""
+    rng = random.Random(seed)
+    n_authors = n_authors or max(n_works // 2, 100)
+    authors = [_make_author(rng, i) for i in range(n_authors)]
+    folded_names = [_fold(author['display_name']) for author in authors]
+    
+    topics = [f"{word} {subject}" for word in TOPIC_WORDS for subject in TOPIC_SUBJECTS]
+    journals = [f"Journal of {rng.choice(TOPIC_WORDS)} {rng.choice(TOPIC_SUBJECTS)} {i}"
+                for i in range(max(n_works // 100, 20))]
+    countries = list(country_weights or COUNTRY_WEIGHTS)
+    weights = list((country_weights or COUNTRY_WEIGHTS).values())
+    home_country = rng.choices(countries, weights, k=n_authors)
+    
+    for w in range(n_works):
+        authorships = []
+        for _ in range(_team_size(rng, hyper_fraction, hyper_authors)):
+            # Cubing skews popularity towards low indices (a few prolific authors)
+            a = int(n_authors * rng.random() ** 3)
+            author = dict(authors[a])
+            roll = rng.random()
+            if roll < 0.05:
+                author['display_name'] = folded_names[a]
+            elif roll < 0.06:
+                author['display_name'] = 'Unknown'
+            elif roll < 0.065:
+                del author['display_name']
+            
+            n_countries = rng.choices([0, 1, 2], [1, 8, 1])[0]
+            codes = [home_country[a]] if n_countries else []
+            if n_countries == 2:
+                codes += rng.choices(countries, weights)
+            authorships.append({
+                'author_position': 'middle',
+                'author': author,
+                'countries': codes,
+                'institutions': [],
+                'raw_affiliation_strings': ['Department of Synthetic Data']
+            })
+        
+        work = {
+            'id': f"https://openalex.org/W{4000000000 + w}",
+            'doi': f"https://doi.org/10.5555/synthetic.{seed}.{w}",
+            'title': f"Synthetic work {w}",
+            'publication_year': 2000 + w % 25,
+            'cited_by_count': int(rng.paretovariate(1.2)) - 1,
+            'authorships': authorships
+        }
+        
+        roll = rng.random()
+        if roll >= missing_location_fraction:
+            work['primary_location'] = {'is_oa': False, 'source': {'display_name': rng.choice(journals), 'type': 'journal'}}
+        elif roll < missing_location_fraction / 3:
+            work['primary_location'] = {'is_oa': False, 'source': None}
+        elif roll < 2 * missing_location_fraction / 3:
+            work['primary_location'] = None
+        
+        if rng.random() >= missing_topic_fraction:
+            work['primary_topic'] = {'id': 'https://openalex.org/T1', 'display_name': rng.choice(topics), 'score': 0.9}
+        
+        yield work
+
+def write_works(path, works):
+    """Write works as a JSON array, one work at a time"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, work in enumerate(works):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(work))
+        f.write(']')
@@ -25,6 +25,7 @@ maxUploadSize = 200
    - Click "uploading an existing file"
    - Drag and drop:
      - `streamlit_app.py`
+     - `openalex_author_search.py`
      - `requirements.txt`
      - `.streamlit/config.toml` (optional)
    - Click "Commit changes"
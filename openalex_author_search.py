@@ -0,0 +1,1844 @@
+"""OpenAlex author search: corpus compilation, filtering, aggregation and ranking
+
+Used by the Streamlit page (streamlit_app.py) and runnable headless:
+
+    python -m openalex_author_search search works.json queries.jsonl -o results.csv
+
+Several exports (say works_1.json works_2.json ...) are parsed in parallel and
+searched as one corpus, with works repeated across them counted once.
+
+Each line of queries.jsonl (or row of a .csv) is a query spec with any of the
+fields topic, journal, country, author, fuzzy_author, min_articles, sort_by,
+max_results, coauthor_cap and id; see QUERY_DEFAULTS.
+"""
+import argparse
+import bisect
+import codecs
+import csv
+import json
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import numpy as np
+from scipy import sparse
+from openpyxl import Workbook
+from io import BytesIO, TextIOWrapper
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+import unicodedata
+
+try:
+    import ijson
+except ImportError:  # fall back to json.load when ijson is not installed
+    ijson = None
+
+# ============================================================================
+# UTILITY FUNCTIONS (from your existing code)
+# ============================================================================
+
+def normalize_author_name(name):
+    """Normalize author names to handle accents and dashes"""
+    if not name:
+        return name
+    
+    normalized = unicodedata.normalize('NFD', name)
+    ascii_name = normalized.encode('ascii', 'ignore').decode('ascii')
+    
+    ascii_name = ascii_name.replace('–', '-')
+    ascii_name = ascii_name.replace('—', '-')
+    ascii_name = ascii_name.replace('−', '-')
+    ascii_name = ascii_name.replace('‐', '-')
+    ascii_name = ascii_name.replace('‑', '-')
+    
+    ascii_name = ' '.join(ascii_name.split())
+    
+    return ascii_name.strip()
+
+# ASCII characters other than the space that str.split() treats as whitespace
+_ASCII_WHITESPACE = str.maketrans(dict.fromkeys('\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f', ' '))
+
+def normalize_author_names(names):
+    """Batched normalize_author_name over a list of name strings
+    
+    The names are joined with NUL separators so that Unicode normalization,
+    ASCII folding and whitespace collapsing each run once over a single string.
+    """
+    joined = '\0'.join(names)
+    if not names or joined.count('\0') != len(names) - 1:
+        return [normalize_author_name(name) for name in names]
+    
+    folded = unicodedata.normalize('NFD', joined).encode('ascii', 'ignore').decode('ascii')
+    folded = folded.translate(_ASCII_WHITESPACE)
+    while '  ' in folded:
+        folded = folded.replace('  ', ' ')
+    folded = folded.replace(' \0', '\0').replace('\0 ', '\0').strip(' ')
+    return folded.split('\0')
+
+COUNTRY_CODES = {
+    'AD': 'Andorra', 'AL': 'Albania', 'AM': 'Armenia', 'AT': 'Austria',
+    'AX': 'Åland Islands', 'BA': 'Bosnia and Herzegovina', 'BE': 'Belgium',
+    'BG': 'Bulgaria', 'BY': 'Belarus', 'CH': 'Switzerland', 'CY': 'Cyprus',
+    'CZ': 'Czech Republic', 'DE': 'Germany', 'DK': 'Denmark', 'EE': 'Estonia',
+    'ES': 'Spain', 'FI': 'Finland', 'FO': 'Faroe Islands', 'FR': 'France',
+    'GB': 'United Kingdom', 'UK': 'United Kingdom', 'GE': 'Georgia',
+    'GG': 'Guernsey', 'GI': 'Gibraltar', 'GR': 'Greece', 'HR': 'Croatia',
+    'HU': 'Hungary', 'IE': 'Ireland', 'IM': 'Isle of Man', 'IS': 'Iceland',
+    'IT': 'Italy', 'JE': 'Jersey', 'LI': 'Liechtenstein', 'LT': 'Lithuania',
+    'LU': 'Luxembourg', 'LV': 'Latvia', 'MC': 'Monaco', 'MD': 'Moldova',
+    'ME': 'Montenegro', 'MK': 'North Macedonia', 'MT': 'Malta', 'NL': 'Netherlands',
+    'NO': 'Norway', 'PL': 'Poland', 'PT': 'Portugal', 'RO': 'Romania',
+    'RS': 'Serbia', 'RU': 'Russia', 'SE': 'Sweden', 'SI': 'Slovenia',
+    'SJ': 'Svalbard and Jan Mayen', 'SK': 'Slovakia', 'SM': 'San Marino',
+    'UA': 'Ukraine', 'VA': 'Vatican City', 'XK': 'Kosovo',
+    'AE': 'United Arab Emirates', 'AF': 'Afghanistan', 'AZ': 'Azerbaijan',
+    'BD': 'Bangladesh', 'BH': 'Bahrain', 'BN': 'Brunei', 'BT': 'Bhutan',
+    'CN': 'China', 'HK': 'Hong Kong', 'ID': 'Indonesia', 'IL': 'Israel',
+    'IN': 'India', 'IQ': 'Iraq', 'IR': 'Iran', 'JO': 'Jordan', 'JP': 'Japan',
+    'KG': 'Kyrgyzstan', 'KH': 'Cambodia', 'KP': 'North Korea', 'KR': 'South Korea',
+    'KW': 'Kuwait', 'KZ': 'Kazakhstan', 'LA': 'Laos', 'LB': 'Lebanon',
+    'LK': 'Sri Lanka', 'MM': 'Myanmar', 'MN': 'Mongolia', 'MO': 'Macau',
+    'MV': 'Maldives', 'MY': 'Malaysia', 'NP': 'Nepal', 'OM': 'Oman',
+    'PH': 'Philippines', 'PK': 'Pakistan', 'PS': 'Palestine', 'QA': 'Qatar',
+    'SA': 'Saudi Arabia', 'SG': 'Singapore', 'SY': 'Syria', 'TH': 'Thailand',
+    'TJ': 'Tajikistan', 'TL': 'Timor-Leste', 'TM': 'Turkmenistan', 'TR': 'Turkey',
+    'TW': 'Taiwan', 'UZ': 'Uzbekistan', 'VN': 'Vietnam', 'YE': 'Yemen',
+    'AO': 'Angola', 'BF': 'Burkina Faso', 'BI': 'Burundi', 'BJ': 'Benin',
+    'BW': 'Botswana', 'CD': 'Democratic Republic of the Congo',
+    'CF': 'Central African Republic', 'CG': 'Republic of the Congo',
+    'CI': 'Ivory Coast', 'CM': 'Cameroon', 'CV': 'Cape Verde', 'DJ': 'Djibouti',
+    'DZ': 'Algeria', 'EG': 'Egypt', 'EH': 'Western Sahara', 'ER': 'Eritrea',
+    'ET': 'Ethiopia', 'GA': 'Gabon', 'GH': 'Ghana', 'GM': 'Gambia',
+    'GN': 'Guinea', 'GQ': 'Equatorial Guinea', 'GW': 'Guinea-Bissau',
+    'KE': 'Kenya', 'KM': 'Comoros', 'LR': 'Liberia', 'LS': 'Lesotho',
+    'LY': 'Libya', 'MA': 'Morocco', 'MG': 'Madagascar', 'ML': 'Mali',
+    'MR': 'Mauritania', 'MU': 'Mauritius', 'MW': 'Malawi', 'MZ': 'Mozambique',
+    'NA': 'Namibia', 'NE': 'Niger', 'NG': 'Nigeria', 'RE': 'Réunion',
+    'RW': 'Rwanda', 'SC': 'Seychelles', 'SD': 'Sudan', 'SL': 'Sierra Leone',
+    'SN': 'Senegal', 'SO': 'Somalia', 'SS': 'South Sudan',
+    'ST': 'São Tomé and Príncipe', 'SZ': 'Eswatini', 'TD': 'Chad', 'TG': 'Togo',
+    'TN': 'Tunisia', 'TZ': 'Tanzania', 'UG': 'Uganda', 'YT': 'Mayotte',
+    'ZA': 'South Africa', 'ZM': 'Zambia', 'ZW': 'Zimbabwe',
+    'AG': 'Antigua and Barbuda', 'AI': 'Anguilla', 'AW': 'Aruba',
+    'BB': 'Barbados', 'BL': 'Saint Barthélemy', 'BM': 'Bermuda',
+    'BQ': 'Caribbean Netherlands', 'BS': 'Bahamas', 'BZ': 'Belize',
+    'CA': 'Canada', 'CR': 'Costa Rica', 'CU': 'Cuba', 'CW': 'Curaçao',
+    'DM': 'Dominica', 'DO': 'Dominican Republic', 'GD': 'Grenada',
+    'GL': 'Greenland', 'GP': 'Guadeloupe', 'GT': 'Guatemala', 'HN': 'Honduras',
+    'HT': 'Haiti', 'JM': 'Jamaica', 'KN': 'Saint Kitts and Nevis',
+    'KY': 'Cayman Islands', 'LC': 'Saint Lucia', 'MF': 'Saint Martin',
+    'MQ': 'Martinique', 'MS': 'Montserrat', 'MX': 'Mexico', 'NI': 'Nicaragua',
+    'PA': 'Panama', 'PM': 'Saint Pierre and Miquelon', 'PR': 'Puerto Rico',
+    'SV': 'El Salvador', 'SX': 'Sint Maarten', 'TC': 'Turks and Caicos Islands',
+    'TT': 'Trinidad and Tobago', 'US': 'United States',
+    'VC': 'Saint Vincent and the Grenadines', 'VG': 'British Virgin Islands',
+    'VI': 'U.S. Virgin Islands',
+    'AR': 'Argentina', 'BO': 'Bolivia', 'BR': 'Brazil', 'CL': 'Chile',
+    'CO': 'Colombia', 'EC': 'Ecuador', 'FK': 'Falkland Islands',
+    'GF': 'French Guiana', 'GY': 'Guyana', 'PE': 'Peru', 'PY': 'Paraguay',
+    'SR': 'Suriname', 'UY': 'Uruguay', 'VE': 'Venezuela',
+    'AS': 'American Samoa', 'AU': 'Australia', 'CK': 'Cook Islands',
+    'FJ': 'Fiji', 'FM': 'Micronesia', 'GU': 'Guam', 'KI': 'Kiribati',
+    'MH': 'Marshall Islands', 'MP': 'Northern Mariana Islands',
+    'NC': 'New Caledonia', 'NF': 'Norfolk Island', 'NR': 'Nauru', 'NU': 'Niue',
+    'NZ': 'New Zealand', 'PF': 'French Polynesia', 'PG': 'Papua New Guinea',
+    'PN': 'Pitcairn Islands', 'PW': 'Palau', 'SB': 'Solomon Islands',
+    'TK': 'Tokelau', 'TO': 'Tonga', 'TV': 'Tuvalu',
+    'UM': 'U.S. Minor Outlying Islands', 'VU': 'Vanuatu',
+    'WF': 'Wallis and Futuna', 'WS': 'Samoa'
+}
+
+CONTINENT_MAP = {
+    'Europe': ['AD', 'AL', 'AT', 'AX', 'BA', 'BE', 'BG', 'BY', 'CH', 'CY',
+               'CZ', 'DE', 'DK', 'EE', 'ES', 'FI', 'FO', 'FR', 'GB', 'UK',
+               'GG', 'GI', 'GR', 'HR', 'HU', 'IE', 'IM', 'IS', 'IT', 'JE',
+               'LI', 'LT', 'LU', 'LV', 'MC', 'MD', 'ME', 'MK', 'MT', 'NL',
+               'NO', 'PL', 'PT', 'RO', 'RS', 'SE', 'SI', 'SJ', 'SK', 'SM',
+               'UA', 'VA', 'XK'],
+    'Asia': ['AE', 'AF', 'AM', 'AZ', 'BD', 'BH', 'BN', 'BT', 'CN', 'GE',
+             'HK', 'ID', 'IL', 'IN', 'IQ', 'IR', 'JO', 'JP', 'KG', 'KH',
+             'KP', 'KR', 'KW', 'KZ', 'LA', 'LB', 'LK', 'MM', 'MN', 'MO',
+             'MV', 'MY', 'NP', 'OM', 'PH', 'PK', 'PS', 'QA', 'SA', 'SG',
+             'SY', 'TH', 'TJ', 'TL', 'TM', 'TR', 'TW', 'UZ', 'VN', 'YE'],
+    'Africa': ['AO', 'BF', 'BI', 'BJ', 'BW', 'CD', 'CF', 'CG', 'CI', 'CM',
+               'CV', 'DJ', 'DZ', 'EG', 'EH', 'ER', 'ET', 'GA', 'GH', 'GM',
+               'GN', 'GQ', 'GW', 'KE', 'KM', 'LR', 'LS', 'LY', 'MA', 'MG',
+               'ML', 'MR', 'MU', 'MW', 'MZ', 'NA', 'NE', 'NG', 'RE', 'RW',
+               'SC', 'SD', 'SL', 'SN', 'SO', 'SS', 'ST', 'SZ', 'TD', 'TG',
+               'TN', 'TZ', 'UG', 'YT', 'ZA', 'ZM', 'ZW'],
+    'North America': ['AG', 'AI', 'AW', 'BB', 'BL', 'BM', 'BQ', 'BS', 'BZ',
+                      'CA', 'CR', 'CU', 'CW', 'DM', 'DO', 'GD', 'GL', 'GP',
+                      'GT', 'HN', 'HT', 'JM', 'KN', 'KY', 'LC', 'MF', 'MQ',
+                      'MS', 'MX', 'NI', 'PA', 'PM', 'PR', 'SV', 'SX', 'TC',
+                      'TT', 'US', 'VC', 'VG', 'VI'],
+    'South America': ['AR', 'BO', 'BR', 'CL', 'CO', 'EC', 'FK', 'GF', 'GY',
+                      'PE', 'PY', 'SR', 'UY', 'VE'],
+    'Oceania': ['AS', 'AU', 'CK', 'FJ', 'FM', 'GU', 'KI', 'MH', 'MP', 'NC',
+                'NF', 'NR', 'NU', 'NZ', 'PF', 'PG', 'PN', 'PW', 'SB', 'TK',
+                'TO', 'TV', 'UM', 'VU', 'WF', 'WS']
+}
+
+# Lookup tables compiled once from the static data above: country code ->
+# continent (the first continent listing a code wins), and lowercase country
+# name or code -> codes (several codes can share a name)
+CONTINENT_OF = {}
+for _continent, _codes in CONTINENT_MAP.items():
+    for _code in _codes:
+        CONTINENT_OF.setdefault(_code, _continent)
+
+COUNTRY_LOOKUP = {}
+for _code, _name in COUNTRY_CODES.items():
+    for _key in (_name.lower(), _code.lower()):
+        COUNTRY_LOOKUP.setdefault(_key, set()).add(_code)
+
+def get_country_name(code):
+    return COUNTRY_CODES.get(code.upper(), code)
+
+def get_continent(country_code):
+    return CONTINENT_OF.get(country_code.upper(), 'Unknown')
+
+@lru_cache(maxsize=256)
+def resolve_country_filter(term):
+    """Codes of the known countries whose lowercase name or code contains term"""
+    return frozenset().union(*(codes for key, codes in COUNTRY_LOOKUP.items() if term in key))
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+logger = logging.getLogger('openalex_author_search')
+
+# tracemalloc state shared by the stages of every Instrumentation
+_tracing_lock = threading.Lock()
+_tracing_stages = 0      # stages measuring memory right now
+_peak_resets = 0         # times a stage reset the traced peak
+_started_tracing = False
+
+def _start_tracing():
+    """Reset the traced peak for a new stage; returns (reset number, memory in use)"""
+    global _tracing_stages, _peak_resets, _started_tracing
+    with _tracing_lock:
+        if not _tracing_stages and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_stages += 1
+        tracemalloc.reset_peak()
+        _peak_resets += 1
+        return _peak_resets, tracemalloc.get_traced_memory()[0]
+
+def _stop_tracing(reset, baseline):
+    """Peak memory in MB since a stage's reset, or None if it was reset or stopped since"""
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        peak_mb = None
+        if _peak_resets == reset and tracemalloc.is_tracing():
+            peak_mb = round((tracemalloc.get_traced_memory()[1] - baseline) / 2**20, 1)
+        _tracing_stages -= 1
+        if not _tracing_stages and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return peak_mb
+
+class Instrumentation:
+    """Per-stage timings, peak memory and counters for one load or search
+    
+    Each finished stage is appended to stages and logged as a JSON line on the
+    openalex_author_search logger. Peak memory is measured with tracemalloc
+    only when track_memory is set, as tracing slows Python allocations down
+    several times; it is the peak above the memory in use when the stage
+    started, across the whole process. Stages are not meant to be nested.
+    
+    tracemalloc is global to the process, so concurrent stages (such as
+    searches of several Streamlit sessions) share it: tracing stops when the
+    last of them ends, and a stage whose peak was reset by another stage
+    starting meanwhile records a peak_mb of None.
+    """
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.stages = []
+        self.counters = Counter()
+    
+    @contextmanager
+    def stage(self, name):
+        if self.track_memory:
+            tracing = _start_tracing()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage': name, 'seconds': round(time.perf_counter() - start, 4), 'peak_mb': None}
+            if self.track_memory:
+                record['peak_mb'] = _stop_tracing(*tracing)
+            self.stages.append(record)
+            logger.info(json.dumps({'event': 'stage', **record}))
+    
+    def count(self, name, n=1):
+        self.counters[name] += int(n)
+    
+    def log_counters(self):
+        logger.info(json.dumps({'event': 'counters', **self.counters}))
+
+def _stage(instrumentation, name):
+    """Time a stage when instrumentation is given, else do nothing"""
+    return instrumentation.stage(name) if instrumentation else nullcontext()
+
+# ============================================================================
+# COLUMNAR CORPUS
+# ============================================================================
+
+class Vocabulary:
+    """Interns strings to dense integer ids in first-seen order"""
+    
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+class InvertedIndex:
+    """Sorted posting lists of work ids per vocabulary id, stored CSR-style"""
+    
+    def __init__(self, offsets, postings):
+        self.offsets = offsets
+        self.postings = postings
+    
+    @classmethod
+    def build(cls, term_ids, work_ids, n_terms):
+        order = np.lexsort((work_ids, term_ids))
+        term_ids, work_ids = term_ids[order], work_ids[order]
+        
+        # A work can list the same country on several authorships
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (term_ids[1:] != term_ids[:-1]) | (work_ids[1:] != work_ids[:-1])
+        term_ids, work_ids = term_ids[keep], work_ids[keep]
+        
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=n_terms), out=offsets[1:])
+        return cls(offsets, work_ids)
+    
+    def lookup(self, term_ids):
+        """Sorted union of the posting lists of term_ids"""
+        postings = [self.postings[self.offsets[t]:self.offsets[t + 1]] for t in term_ids]
+        if len(postings) == 1:
+            return postings[0]
+        return np.unique(np.concatenate(postings)) if postings else self.postings[:0]
+
+class NameTable:
+    """Normalized author keys for the interned author display names
+    
+    author_key[i] is the integer key of the i-th distinct display name, or -1
+    for names that never get a profile ('' and 'Unknown'); keys[k] is the
+    normalized name of key k. Each distinct name is normalized exactly once.
+    """
+    
+    def __init__(self, keys, author_key):
+        self.keys = keys
+        self.author_key = author_key
+    
+    @classmethod
+    def build(cls, names):
+        normalized = normalize_author_names(names)
+        keys = Vocabulary()
+        author_key = np.array([
+            keys.intern(key) if name and name != 'Unknown' else -1
+            for name, key in zip(names, normalized)
+        ], dtype=np.int32)
+        return cls(keys.names, author_key)
+    
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'keys': self.keys, 'author_key': self.author_key.tolist()}, f)
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['keys'], np.array(data['author_key'], dtype=np.int32))
+
+# Words of a lowercased normalized name, for fuzzy author search
+_NAME_WORD = re.compile(r'[a-z0-9]+')
+_NOT_NAME_WORD = re.compile(r'[^a-z0-9\0]+')
+
+# Fuzzy candidate keys below this many are checked directly for further words
+FUZZY_VERIFY_KEYS = 1000
+
+def _name_trigrams(word):
+    return {f'${word}$'[i:i + 3] for i in range(len(word))}
+
+def _max_edits(word):
+    """Edits tolerated when fuzzy-matching a word: none for initials and short words"""
+    return 0 if len(word) < 4 else 1 if len(word) < 8 else 2
+
+def _within_edits(a, b, max_edits):
+    """Whether the Levenshtein distance between a and b is at most max_edits"""
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > max_edits:
+            return False
+        previous = current
+    return previous[-1] <= max_edits
+
+class AuthorNameIndex:
+    """Substring, prefix and fuzzy lookup of author name keys, and their works
+    
+    Substring search scans one string joining the lowercased normalized keys
+    and raw display names, so it runs in C. Fuzzy search works on the words of
+    the normalized keys: a sorted word list answers prefix lookups and a
+    trigram index over the words yields the candidates for bounded edit
+    distance, which are then verified. works() maps keys to their works.
+    """
+    
+    def __init__(self, name_table, authors, key_works):
+        self.keys = name_table.keys
+        texts = list(name_table.keys) + list(authors)
+        self._text = '\0'.join(texts).lower()
+        if len(self._text) != len(texts) - 1 + sum(map(len, texts)):
+            self._text = '\0'.join([text.lower() for text in texts])  # lowercasing changed some lengths
+            lengths = [len(text.lower()) + 1 for text in texts]
+        else:
+            lengths = [len(text) + 1 for text in texts]
+        self._text_starts = np.cumsum([0] + lengths[:-1])
+        self._text_key = np.concatenate([np.arange(len(name_table.keys)), name_table.author_key]).astype(np.int64)
+        
+        # Tokenize all keys in one pass; NUL marks the start of the next key
+        joined = '\0'.join(name_table.keys)
+        if joined.count('\0') != len(name_table.keys) - 1:
+            joined = '\0'.join(key.replace('\0', ' ') for key in name_table.keys)
+        tokens = _NOT_NAME_WORD.sub(' ', joined.lower()).replace('\0', ' \0 ').split()
+        is_marker = np.fromiter(map('\0'.__eq__, tokens), dtype=bool, count=len(tokens))
+        word_list = [token for token in tokens if token != '\0']
+        word_ids = {word: i for i, word in enumerate(dict.fromkeys(word_list))}
+        self.words = list(word_ids)
+        self._word_index = InvertedIndex.build(
+            np.fromiter(map(word_ids.__getitem__, word_list), dtype=np.int64, count=len(word_list)),
+            np.cumsum(is_marker)[~is_marker],
+            len(self.words)
+        )
+        self._sorted_words = sorted(self.words)
+        self._sorted_word_ids = np.fromiter(map(word_ids.__getitem__, self._sorted_words), dtype=np.int64,
+                                            count=len(self.words))
+        
+        trigrams, trigram_ids, trigram_words = Vocabulary(), array('q'), array('q')
+        for word_id, word in enumerate(self.words):
+            for trigram in _name_trigrams(word):
+                trigram_ids.append(trigrams.intern(trigram))
+                trigram_words.append(word_id)
+        self._trigrams = trigrams.ids
+        self._trigram_index = InvertedIndex.build(
+            np.frombuffer(trigram_ids, dtype=np.int64), np.frombuffer(trigram_words, dtype=np.int64),
+            len(trigrams.names)
+        )
+        self._key_works = key_works
+    
+    @classmethod
+    def build(cls, corpus):
+        keys = corpus.name_table.author_key[corpus.authorship_author]
+        named = keys >= 0
+        key_works = InvertedIndex.build(keys[named], corpus.authorship_work()[named], len(corpus.name_table.keys))
+        return cls(corpus.name_table, corpus.authors, key_works)
+    
+    def match(self, term, fuzzy=False):
+        """Sorted ids of the name keys matching a search term
+        
+        A key matches when the lowercased term is a substring of it or of one
+        of its display names. With fuzzy, a key also matches when every word
+        of the normalized term, in any order, starts one of its words or is
+        within _max_edits edits of one.
+        """
+        keys = self._substring_keys(term.lower())
+        if fuzzy:
+            # Look up the most selective (longest) word, then narrow down with the others
+            words = sorted(_NAME_WORD.findall(normalize_author_name(term).lower()), key=len, reverse=True)
+            if words:
+                fuzzy_keys = self._word_keys(words[0])
+                for word in words[1:]:
+                    if len(fuzzy_keys) <= FUZZY_VERIFY_KEYS:
+                        fuzzy_keys = np.array(
+                            [key for key in fuzzy_keys.tolist() if self._key_has_word(key, word)], dtype=np.int64
+                        )
+                    else:
+                        fuzzy_keys = np.intersect1d(fuzzy_keys, self._word_keys(word))
+                keys = np.union1d(keys, fuzzy_keys)
+        return keys
+    
+    def works(self, keys):
+        """Sorted ids of the works with an authorship under any of the keys"""
+        return self._key_works.lookup(keys)
+    
+    def _substring_keys(self, term):
+        if not term or '\0' in term:
+            return np.zeros(0, dtype=np.int64)
+        positions = [match.start() for match in re.finditer(re.escape(term), self._text)]
+        keys = self._text_key[np.searchsorted(self._text_starts, positions, side='right') - 1]
+        return np.unique(keys[keys >= 0])
+    
+    def _key_has_word(self, key, word):
+        max_edits = _max_edits(word)
+        return any(
+            other.startswith(word) or (max_edits and _within_edits(word, other, max_edits))
+            for other in _NAME_WORD.findall(self.keys[key].lower())
+        )
+    
+    def _word_keys(self, word):
+        """Keys with a word that word prefixes or is within _max_edits edits of"""
+        lo = bisect.bisect_left(self._sorted_words, word)
+        hi = bisect.bisect_left(self._sorted_words, word + '\x7f', lo)
+        word_ids = self._sorted_word_ids[lo:hi]
+        
+        max_edits = _max_edits(word)
+        if max_edits:
+            # Each edit changes at most three trigrams of the word
+            trigrams = [self._trigrams[t] for t in _name_trigrams(word) if t in self._trigrams]
+            index = self._trigram_index
+            shared = np.bincount(
+                np.concatenate([index.postings[index.offsets[t]:index.offsets[t + 1]] for t in trigrams] or [[]])
+                .astype(np.int64),
+                minlength=len(self.words)
+            )
+            candidates = np.flatnonzero(shared >= len(_name_trigrams(word)) - 3 * max_edits)
+            similar = [c for c in candidates.tolist() if _within_edits(word, self.words[c], max_edits)]
+            word_ids = np.union1d(word_ids, similar).astype(np.int64)
+        
+        return self._word_index.lookup(word_ids)
+
+class Corpus:
+    """Works compiled once into integer-interned, CSR-style NumPy columns
+    
+    Per work: journal, topic and citation columns, plus authorship_offsets so
+    that authorships[w] spans authorship_offsets[w]:authorship_offsets[w + 1].
+    Per authorship: author name, ORCID and OpenAlex ids (-1 when missing) and
+    country_offsets into the flat authorship_country column.
+    """
+    
+    def __init__(self, journals, topics, authors, orcids, openalex_ids, countries,
+                 work_journal, work_topic, work_citations, authorship_offsets,
+                 authorship_author, authorship_orcid, authorship_openalex_id,
+                 country_offsets, authorship_country, name_table=None, indexes=None):
+        self.journals = journals
+        self.topics = topics
+        self.authors = authors
+        self.orcids = orcids
+        self.openalex_ids = openalex_ids
+        self.countries = countries
+        self.work_journal = work_journal
+        self.work_topic = work_topic
+        self.work_citations = work_citations
+        self.authorship_offsets = authorship_offsets
+        self.authorship_author = authorship_author
+        self.authorship_orcid = authorship_orcid
+        self.authorship_openalex_id = authorship_openalex_id
+        self.country_offsets = country_offsets
+        self.authorship_country = authorship_country
+        
+        if name_table is None or len(name_table.author_key) != len(authors):
+            name_table = NameTable.build(authors)
+        self.name_table = name_table
+        
+        if indexes is None:
+            work_ids = np.arange(self.n_works)
+            country_work = np.repeat(self.authorship_work(), np.diff(country_offsets))
+            indexes = (
+                InvertedIndex.build(work_topic, work_ids, len(topics)),
+                InvertedIndex.build(work_journal, work_ids, len(journals)),
+                InvertedIndex.build(authorship_country, country_work, len(countries))
+            )
+        self.topic_index, self.journal_index, self.country_index = indexes
+        self._author_index = None
+    
+    @property
+    def author_index(self):
+        """AuthorNameIndex over the author names, built on first use"""
+        if self._author_index is None:
+            self._author_index = AuthorNameIndex.build(self)
+        return self._author_index
+    
+    @property
+    def n_works(self):
+        return len(self.work_journal)
+    
+    def authorship_work(self):
+        """Work index of every authorship"""
+        return np.repeat(np.arange(self.n_works), np.diff(self.authorship_offsets))
+
+def _intern_optional(vocab, value):
+    return vocab.intern(value) if value else -1
+
+def _remap_vocabulary(vocab, names, ids):
+    """Intern names[ids] into vocab in first-occurrence order, as a lookup from old to new ids
+    
+    The returned array has one extra slot so that missing (-1) ids stay -1.
+    """
+    used, first = np.unique(ids[ids >= 0], return_index=True)
+    used = used[np.argsort(first, kind='stable')]
+    remap = np.full(len(names) + 1, -1, dtype=np.int32)
+    remap[used] = [vocab.intern(names[i]) for i in used]
+    return remap
+
+class CorpusBuilder:
+    """Accumulates works into the columns of a Corpus
+    
+    Works are deduplicated by their OpenAlex id as they are added, with a set
+    of the ids seen so far; works without an id are always kept. Builders
+    compiled separately (say, one per file in worker processes) are combined
+    with merge, which applies the same deduplication across them.
+    """
+    
+    VOCABULARIES = ('journals', 'topics', 'authors', 'orcids', 'openalex_ids', 'countries')
+    
+    def __init__(self):
+        for field in self.VOCABULARIES:
+            setattr(self, field, Vocabulary())
+        self.work_journal, self.work_topic, self.work_citations = array('i'), array('i'), array('q')
+        self.authorship_offsets = array('q', [0])
+        self.authorship_author, self.authorship_orcid, self.authorship_openalex_id = array('i'), array('i'), array('i')
+        self.country_offsets = array('q', [0])
+        self.authorship_country = array('i')
+        self.work_ids = []
+        self.seen = set()
+        self.duplicates = 0
+    
+    @property
+    def n_works(self):
+        return len(self.work_journal)
+    
+    def _is_new(self, work_id):
+        if not work_id:
+            return True
+        if work_id in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(work_id)
+        return True
+    
+    def add(self, work):
+        """Append one (slimmed) work, unless a work with the same id was already added"""
+        work_id = work.get('id')
+        if not self._is_new(work_id):
+            return
+        self.work_ids.append(work_id)
+        self.work_citations.append(int(work.get('cited_by_count') or 0))
+        
+        primary_loc = work.get('primary_location') or {}
+        source = primary_loc.get('source') or {}
+        self.work_journal.append(self.journals.intern(source.get('display_name') or 'Unknown'))
+        
+        topic = work.get('primary_topic') or {}
+        self.work_topic.append(self.topics.intern(topic.get('display_name') or 'Unknown'))
+        
+        authorships = work.get('authorships') or []
+        for authorship in authorships:
+            author_info = authorship.get('author') or {}
+            self.authorship_author.append(self.authors.intern(author_info.get('display_name') or ''))
+            self.authorship_orcid.append(_intern_optional(self.orcids, author_info.get('orcid')))
+            self.authorship_openalex_id.append(_intern_optional(self.openalex_ids, author_info.get('id')))
+            
+            for country_code in authorship.get('countries') or []:
+                if country_code:
+                    self.authorship_country.append(self.countries.intern(country_code))
+            self.country_offsets.append(len(self.authorship_country))
+        self.authorship_offsets.append(len(self.authorship_author))
+    
+    def merge(self, other):
+        """Append the works of another builder, skipping ids already added
+        
+        Gives the same columns as adding the other builder's works one by one.
+        """
+        keep = np.fromiter((self._is_new(work_id) for work_id in other.work_ids), dtype=bool,
+                           count=len(other.work_ids))
+        self.duplicates += other.duplicates
+        self.work_ids.extend(work_id for work_id, kept in zip(other.work_ids, keep) if kept)
+        
+        authorship_counts = np.diff(np.frombuffer(other.authorship_offsets, dtype=np.int64))
+        country_counts = np.diff(np.frombuffer(other.country_offsets, dtype=np.int64))
+        keep_authorship = np.repeat(keep, authorship_counts)
+        keep_country = np.repeat(keep_authorship, country_counts)
+        
+        def kept(column, mask):
+            return np.frombuffer(getattr(other, column), dtype=np.int32)[mask]
+        
+        for vocab, column, mask in (
+            ('journals', 'work_journal', keep), ('topics', 'work_topic', keep),
+            ('authors', 'authorship_author', keep_authorship), ('orcids', 'authorship_orcid', keep_authorship),
+            ('openalex_ids', 'authorship_openalex_id', keep_authorship),
+            ('countries', 'authorship_country', keep_country)
+        ):
+            ids = kept(column, mask)
+            remap = _remap_vocabulary(getattr(self, vocab), getattr(other, vocab).names, ids)
+            getattr(self, column).frombytes(remap[ids].tobytes())
+        self.work_citations.frombytes(np.frombuffer(other.work_citations, dtype=np.int64)[keep].tobytes())
+        
+        for offsets, counts in ((self.authorship_offsets, authorship_counts[keep]),
+                                (self.country_offsets, country_counts[keep_authorship])):
+            offsets.frombytes((offsets[-1] + np.cumsum(counts, dtype=np.int64)).tobytes())
+    
+    def build(self, name_table=None, instrumentation=None):
+        """The Corpus of the works added so far
+        
+        A previously saved name_table for the same works skips re-normalizing
+        the author names.
+        """
+        if name_table is None or len(name_table.author_key) != len(self.authors):
+            with _stage(instrumentation, 'normalize names'):
+                name_table = NameTable.build(self.authors.names)
+        
+        with _stage(instrumentation, 'build indexes'):
+            corpus = Corpus(
+                *(getattr(self, field).names for field in self.VOCABULARIES),
+                np.frombuffer(self.work_journal, dtype=np.int32),
+                np.frombuffer(self.work_topic, dtype=np.int32),
+                np.frombuffer(self.work_citations, dtype=np.int64),
+                np.frombuffer(self.authorship_offsets, dtype=np.int64),
+                np.frombuffer(self.authorship_author, dtype=np.int32),
+                np.frombuffer(self.authorship_orcid, dtype=np.int32),
+                np.frombuffer(self.authorship_openalex_id, dtype=np.int32),
+                np.frombuffer(self.country_offsets, dtype=np.int64),
+                np.frombuffer(self.authorship_country, dtype=np.int32),
+                name_table
+            )
+        
+        if instrumentation:
+            instrumentation.count('works_loaded', corpus.n_works)
+            instrumentation.count('duplicate_works_skipped', self.duplicates)
+            instrumentation.count('authorships_loaded', len(corpus.authorship_author))
+            instrumentation.count('distinct_author_names', len(corpus.authors))
+        return corpus
+
+def compile_corpus(works, name_table=None, instrumentation=None):
+    """Compile an iterable of (slimmed) works into a Corpus in a single pass
+    
+    Works repeating the OpenAlex id of an earlier work are skipped. A
+    previously saved name_table for the same export skips re-normalizing the
+    author names. With instrumentation, parsing, name normalization and index
+    building are timed as separate stages.
+    """
+    builder = CorpusBuilder()
+    with _stage(instrumentation, 'parse'):
+        for work in works:
+            builder.add(work)
+    return builder.build(name_table, instrumentation)
+
+def _match_vocabulary(names, term):
+    """Ids of the vocabulary entries containing term (case-insensitive)"""
+    return [i for i, name in enumerate(names) if term in name.lower()]
+
+def _match_countries(countries, term):
+    """Ids of the country codes matching term by country name or by code"""
+    codes = resolve_country_filter(term)
+    return [i for i, code in enumerate(countries) if code.upper() in codes or term in code.lower()]
+
+def filter_works(corpus, topic_filter=None, journal_filter=None, country_filter=None, author_filter=None,
+                 fuzzy_authors=False, instrumentation=None):
+    """Return the sorted indices of the works passing all filters
+    
+    Each filter term is resolved against its vocabulary of distinct names, the
+    posting lists of the matching names are unioned, and the per-filter work
+    sets are intersected smallest first. author_filter keeps the works of the
+    authors it matches in corpus.author_index, so that only those are
+    aggregated; the exact name check happens when ranking.
+    """
+    with _stage(instrumentation, 'filter'):
+        work_ids, works_scanned = _filter_works(
+            corpus, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors
+        )
+    if instrumentation:
+        instrumentation.count('works_scanned', works_scanned)
+        instrumentation.count('works_passing_filters', len(work_ids))
+    return work_ids
+
+def _filter_works(corpus, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors):
+    """Filtered work ids and the number of posting list entries read"""
+    matches = []
+    if author_filter:
+        author_index = corpus.author_index
+        matches.append(author_index.works(author_index.match(author_filter, fuzzy_authors)))
+    if topic_filter:
+        matches.append(corpus.topic_index.lookup(_match_vocabulary(corpus.topics, topic_filter)))
+    if journal_filter:
+        matches.append(corpus.journal_index.lookup(_match_vocabulary(corpus.journals, journal_filter)))
+    if country_filter:
+        matches.append(corpus.country_index.lookup(_match_countries(corpus.countries, country_filter)))
+    
+    if not matches:
+        return np.arange(corpus.n_works), corpus.n_works
+    
+    matches.sort(key=len)
+    work_ids = matches[0]
+    for other in matches[1:]:
+        work_ids = np.intersect1d(work_ids, other, assume_unique=True)
+    return work_ids, sum(len(match) for match in matches)
+
+def _expand_ranges(starts, ends):
+    """Concatenation of np.arange(start, end) for every (start, end) pair"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(total) - np.repeat(offsets - starts, lengths)
+
+def count_coauthors(corpus, work_ids, author_profile, n_profiles, coauthor_cap=None):
+    """Co-author counts per profile as a sparse (profile x author name) matrix
+    
+    author_profile maps every interned author name to its profile index, or -1
+    for names that do not get a profile. Each authorship credits every other
+    named authorship of the same work whose raw name differs, which is the
+    product of the work x profile and work x name incidence matrices minus the
+    same-name diagonal. With coauthor_cap set, works with more authorships only
+    credit their first coauthor_cap authorships as co-authors, so the cost per
+    work is linear in team size instead of quadratic.
+    """
+    starts = corpus.authorship_offsets[work_ids]
+    lengths = corpus.authorship_offsets[work_ids + 1] - starts
+    authorships = _expand_ranges(starts, starts + lengths)
+    rows = np.repeat(np.arange(len(work_ids)), lengths)
+    names = corpus.authorship_author[authorships]
+    
+    is_subject = author_profile[names] >= 0
+    is_coauthor = np.array([bool(name) for name in corpus.authors], dtype=bool)[names]
+    if coauthor_cap:
+        is_coauthor &= authorships - np.repeat(starts, lengths) < coauthor_cap
+    
+    shape = (len(work_ids), n_profiles)
+    subjects = sparse.csr_matrix(
+        (np.ones(is_subject.sum(), dtype=np.int64), (rows[is_subject], author_profile[names[is_subject]])),
+        shape=shape
+    )
+    shape = (len(work_ids), len(corpus.authors))
+    coauthors = sparse.csr_matrix(
+        (np.ones(is_coauthor.sum(), dtype=np.int64), (rows[is_coauthor], names[is_coauthor])),
+        shape=shape
+    )
+    
+    # An authorship never credits a co-author with the same raw name
+    named_subjects = sparse.csr_matrix(
+        (np.ones(is_subject.sum(), dtype=np.int64), (rows[is_subject], names[is_subject])),
+        shape=shape
+    )
+    same_name = np.asarray(named_subjects.multiply(coauthors).sum(axis=0)).ravel()
+    same_name_ids = np.flatnonzero(same_name)
+    diagonal = sparse.csr_matrix(
+        (same_name[same_name_ids], (author_profile[same_name_ids], same_name_ids)),
+        shape=(n_profiles, len(corpus.authors))
+    )
+    
+    counts = (subjects.T @ coauthors - diagonal).tocsr()
+    counts.eliminate_zeros()
+    counts.sort_indices()
+    return counts
+
+# Most common topics, journals and co-authors kept per profile
+TOP_ITEMS = 5
+
+# Co-author cap of the Streamlit page and batch query specs unless set to 0:
+# counting every co-author of hyper-authored works is quadratic in team size
+DEFAULT_COAUTHOR_CAP = 100
+
+class Tally:
+    """Sparse (profile, item, count) tallies, most common first per profile
+    
+    Profile i's items and counts are items[offsets[i]:offsets[i + 1]] (and the
+    same slice of counts), sorted by decreasing count; ties keep the order of
+    the input triples, as Counter.most_common keeps insertion order.
+    """
+    
+    def __init__(self, offsets, items, counts):
+        self.offsets = offsets
+        self.items = items
+        self.counts = counts
+    
+    @classmethod
+    def from_counts(cls, profiles, items, counts, n_profiles, limit=None):
+        """Tally of triples given in tie-break order, keeping at most limit items per profile"""
+        order = np.argsort((profiles.astype(np.int64) << 32) - counts, kind='stable')
+        profiles, items, counts = profiles[order], items[order], counts[order]
+        sizes = np.bincount(profiles, minlength=n_profiles)
+        
+        if limit is not None:
+            starts = np.cumsum(sizes) - sizes
+            keep = np.arange(len(profiles)) - starts[profiles] < limit
+            items, counts = items[keep], counts[keep]
+            sizes = np.minimum(sizes, limit)
+        
+        offsets = np.zeros(n_profiles + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        return cls(offsets, items.astype(np.int32), counts.astype(np.int32))
+    
+    @classmethod
+    def from_occurrences(cls, profiles, items, n_profiles, n_items, limit=None):
+        """Tally of (profile, item) occurrences in order; ties keep first-seen order"""
+        codes = profiles.astype(np.int64) * max(n_items, 1) + items
+        codes, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        codes, counts = codes[order], counts[order]
+        return cls.from_counts(codes // max(n_items, 1), codes % max(n_items, 1), counts, n_profiles, limit)
+    
+    @classmethod
+    def concatenate(cls, tallies):
+        """One tally of the profiles of several tallies, in order"""
+        shifts = np.cumsum([0] + [len(t.items) for t in tallies[:-1]])
+        offsets = [t.offsets[:-1] + shift for t, shift in zip(tallies, shifts)]
+        offsets.append([sum(len(t.items) for t in tallies)])
+        return cls(np.concatenate(offsets).astype(np.int64), np.concatenate([t.items for t in tallies]),
+                   np.concatenate([t.counts for t in tallies]))
+    
+    def top(self, profile):
+        """Item ids of one profile, most common first"""
+        return self.items[self.offsets[profile]:self.offsets[profile + 1]]
+    
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.items.nbytes + self.counts.nbytes
+
+class AuthorProfiles:
+    """Author profiles aggregated from a set of works, stored as parallel arrays
+    
+    Profiles are numbered in order of first appearance. Profile i has the
+    normalized name corpus.name_table.keys[key[i]], count[i] authorships and
+    their citations citations[citation_offsets[i]:citation_offsets[i + 1]] in
+    work order. display_author, orcid and openalex_id are the first interned
+    author name, ORCID and OpenAlex id seen for it (-1 when none). topics,
+    journals and coauthors keep the TOP_ITEMS most common items per profile,
+    countries only the most common one. metrics() holds the PROFILE_METRICS.
+    """
+    
+    def __init__(self, corpus, key, count, citation_offsets, citations, display_author, orcid, openalex_id,
+                 topics, journals, countries, coauthors=None):
+        self.corpus = corpus
+        self.key = key
+        self.count = count
+        self.citation_offsets = citation_offsets
+        self.citations = citations
+        self.display_author = display_author
+        self.orcid = orcid
+        self.openalex_id = openalex_id
+        self.topics = topics
+        self.journals = journals
+        self.countries = countries
+        self.coauthors = coauthors
+        self._metrics = None
+    
+    def __len__(self):
+        return len(self.key)
+    
+    def name(self, i):
+        return self.corpus.name_table.keys[self.key[i]]
+    
+    def display_name(self, i):
+        return self.corpus.authors[self.display_author[i]]
+    
+    def citations_of(self, i):
+        return self.citations[self.citation_offsets[i]:self.citation_offsets[i + 1]]
+    
+    def metrics(self):
+        """Metric name -> value per profile, computed on first use"""
+        if self._metrics is None:
+            self._metrics = profile_metrics(self)
+        return self._metrics
+    
+    @property
+    def nbytes(self):
+        arrays = (self.key, self.count, self.citation_offsets, self.citations,
+                  self.display_author, self.orcid, self.openalex_id)
+        tallies = (self.topics, self.journals, self.countries, self.coauthors)
+        return sum(a.nbytes for a in arrays) + sum(t.nbytes for t in tallies if t is not None)
+
+def _first_per_profile(profiles, values, n_profiles):
+    """First non-negative value seen for each profile, or -1"""
+    present = values >= 0
+    first_profiles, first = np.unique(profiles[present], return_index=True)
+    result = np.full(n_profiles, -1, dtype=np.int32)
+    result[first_profiles] = values[present][first]
+    return result
+
+def _aggregate_works(corpus, work_ids, pool=None):
+    """Profiles (without co-authors) for a sorted array of work ids
+    
+    Returns the profiles and the profile index of every interned author name
+    (-1 for names without a profile). With a thread pool, the topic, journal
+    and country tallies are built concurrently.
+    """
+    offsets = corpus.authorship_offsets
+    starts, ends = offsets[work_ids], offsets[work_ids + 1]
+    authorships = _expand_ranges(starts, ends)
+    authorship_works = np.repeat(work_ids, ends - starts)
+    
+    name_table = corpus.name_table
+    names = corpus.authorship_author[authorships]
+    keys = name_table.author_key[names]
+    named = keys >= 0
+    authorships, authorship_works, names, keys = authorships[named], authorship_works[named], names[named], keys[named]
+    
+    # Number profiles in order of first appearance
+    unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    appearance = np.argsort(first)
+    rank = np.empty(len(appearance), dtype=np.int64)
+    rank[appearance] = np.arange(len(appearance))
+    profiles = rank[inverse.reshape(-1)]
+    n_profiles = len(appearance)
+    
+    count = np.bincount(profiles, minlength=n_profiles).astype(np.int32)
+    citation_offsets = np.zeros(n_profiles + 1, dtype=np.int64)
+    np.cumsum(count, out=citation_offsets[1:])
+    citations = corpus.work_citations[authorship_works[np.argsort(profiles, kind='stable')]]
+    
+    topics = corpus.work_topic[authorship_works]
+    known_topic = topics != (corpus.topics.index('Unknown') if 'Unknown' in corpus.topics else -1)
+    journals = corpus.work_journal[authorship_works]
+    known_journal = journals != (corpus.journals.index('Unknown') if 'Unknown' in corpus.journals else -1)
+    
+    country_starts = corpus.country_offsets[authorships]
+    country_ends = corpus.country_offsets[authorships + 1]
+    
+    # The trailing -1 maps names without a key (-1) to no profile
+    profile_of_key = np.full(len(name_table.keys) + 1, -1, dtype=np.int64)
+    profile_of_key[unique_keys[appearance]] = np.arange(n_profiles)
+    author_profile = profile_of_key[name_table.author_key]
+    
+    tallies = (pool.map if pool else map)(lambda args: Tally.from_occurrences(*args), [
+        (profiles[known_topic], topics[known_topic], n_profiles, len(corpus.topics), TOP_ITEMS),
+        (profiles[known_journal], journals[known_journal], n_profiles, len(corpus.journals), TOP_ITEMS),
+        (np.repeat(profiles, country_ends - country_starts),
+         corpus.authorship_country[_expand_ranges(country_starts, country_ends)], n_profiles, len(corpus.countries), 1)
+    ])
+    
+    return AuthorProfiles(
+        corpus,
+        unique_keys[appearance].astype(np.int32),
+        count,
+        citation_offsets,
+        citations,
+        names[first[appearance]],
+        _first_per_profile(profiles, corpus.authorship_orcid[authorships], n_profiles),
+        _first_per_profile(profiles, corpus.authorship_openalex_id[authorships], n_profiles),
+        *tallies
+    ), author_profile
+
+# Selected works above which aggregation is spread over a thread pool (NumPy
+# and the sparse product release the GIL, so threads share the corpus columns
+# without copying them), and co-author shards per pool thread
+PARALLEL_MIN_WORKS = 20_000
+PARALLEL_SHARDS_PER_WORKER = 2
+
+def _profile_shards(corpus, work_ids, author_profile, n_profiles, n_shards):
+    """Split the profiles into contiguous ranges crediting about as many co-author
+    pairs each, as (first profile, last profile + 1, works with those profiles)"""
+    if not n_profiles:
+        return [(0, 0, work_ids)]
+    
+    starts = corpus.authorship_offsets[work_ids]
+    lengths = corpus.authorship_offsets[work_ids + 1] - starts
+    profiles = author_profile[corpus.authorship_author[_expand_ranges(starts, starts + lengths)]]
+    is_subject = profiles >= 0
+    profiles = profiles[is_subject]
+    pairs = np.cumsum(np.bincount(profiles, weights=np.repeat(lengths, lengths)[is_subject], minlength=n_profiles))
+    
+    bounds = np.searchsorted(pairs, pairs[-1] * np.arange(1, n_shards) / n_shards)
+    bounds = np.unique(np.concatenate([[0], bounds, [n_profiles]]))
+    
+    # Works of each shard's profiles, sorted by shard then work
+    shard_works = np.unique(
+        (np.searchsorted(bounds, profiles, side='right') - 1) * len(work_ids)
+        + np.repeat(np.arange(len(work_ids)), lengths)[is_subject]
+    )
+    splits = np.searchsorted(shard_works, np.arange(1, len(bounds) - 1) * len(work_ids))
+    works = np.split(work_ids[shard_works % len(work_ids)], splits)
+    return list(zip(bounds[:-1], bounds[1:], works))
+
+def _coauthor_shard(corpus, author_profile, first, last, work_ids, coauthor_cap):
+    """Top co-authors of profiles first..last - 1 over their works, and their number of co-author pairs"""
+    shard_profile = np.where((author_profile >= first) & (author_profile < last), author_profile - first, -1)
+    counts = count_coauthors(corpus, work_ids, shard_profile, last - first, coauthor_cap)
+    # Ties keep the matrix's column order, i.e. co-authors in order of first appearance in the
+    # corpus; the original loop listed them in the order it first credited them. Only which of
+    # equally counted co-authors are displayed differs.
+    coauthors = Tally.from_counts(np.repeat(np.arange(last - first), np.diff(counts.indptr)),
+                                  counts.indices, counts.data, last - first, TOP_ITEMS)
+    return coauthors, counts.nnz
+
+def aggregate_author_profiles(corpus, work_ids, coauthor_cap=None, instrumentation=None, workers=None):
+    """Aggregate the given works into author profiles keyed by normalized name
+    
+    The authorships of all the works are tallied in a few vectorized passes,
+    and co-authors are counted afterwards in one sparse pass. Above
+    PARALLEL_MIN_WORKS works, both run on a thread pool (workers defaults to
+    one per CPU): the tallies concurrently, and co-authors in shards of
+    profiles, which are independent of each other and concatenated in profile
+    order, so the result is identical to the serial one.
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(work_ids) >= PARALLEL_MIN_WORKS else 1
+    
+    with ThreadPoolExecutor(workers) if workers > 1 else nullcontext() as pool:
+        with _stage(instrumentation, 'aggregate works'):
+            author_profiles, author_profile = _aggregate_works(corpus, work_ids, pool)
+        
+        with _stage(instrumentation, 'count co-authors'):
+            n_profiles = len(author_profiles)
+            if pool:
+                shards = _profile_shards(corpus, work_ids, author_profile, n_profiles,
+                                         workers * PARALLEL_SHARDS_PER_WORKER)
+            else:
+                shards = [(0, n_profiles, work_ids)]
+            shards = list((pool.map if pool else map)(
+                lambda shard: _coauthor_shard(corpus, author_profile, *shard, coauthor_cap), shards
+            ))
+            author_profiles.coauthors = Tally.concatenate([tally for tally, _ in shards])
+    
+    if instrumentation:
+        offsets = corpus.authorship_offsets
+        instrumentation.count('authorships_processed', (offsets[work_ids + 1] - offsets[work_ids]).sum())
+        instrumentation.count('profiles_built', n_profiles)
+        instrumentation.count('coauthor_pairs', sum(pairs for _, pairs in shards))
+        instrumentation.count('profile_bytes', author_profiles.nbytes)
+    return author_profiles
+
+def process_works_to_author_profiles(corpus, topic_filter=None, journal_filter=None, country_filter=None,
+                                     coauthor_cap=None):
+    """Process works into author profiles with filtering"""
+    work_ids = filter_works(corpus, topic_filter, journal_filter, country_filter)
+    return aggregate_author_profiles(corpus, work_ids, coauthor_cap)
+
+def _round_averages(totals, counts):
+    """round(total / count, 1) for every pair, vectorized
+    
+    np.round can only disagree with round() where total / count lies exactly
+    halfway between two tenths; those few are rounded one by one.
+    """
+    averages = np.round(totals / counts, 1)
+    halfway = np.flatnonzero(20 * totals % (2 * counts) == counts)
+    averages[halfway] = [round(t / c, 1) for t, c in zip(totals[halfway].tolist(), counts[halfway].tolist())]
+    return averages
+
+def _h_index(profiles, citations, metrics):
+    """Largest h such that h of the profile's works have h or more citations"""
+    segments = np.repeat(np.arange(len(profiles)), profiles.count)
+    # Ascending position j of a segment of length n is the (n - j)-th most cited
+    rank = profiles.count[segments] - (np.arange(len(citations)) - profiles.citation_offsets[segments])
+    return np.bincount(segments, weights=citations >= rank, minlength=len(profiles)).astype(np.int32)
+
+# Per-profile metrics, computed in bulk in this order by functions of
+# (profiles, citations sorted within each profile, metrics computed so far).
+# A new metric becomes sortable by adding it here and to SORT_KEYS.
+PROFILE_METRICS = {
+    'count': lambda profiles, citations, metrics: profiles.count,
+    'total_citations': lambda profiles, citations, metrics: np.add.reduceat(
+        citations, profiles.citation_offsets[:-1]
+    ),
+    'average_citations': lambda profiles, citations, metrics: _round_averages(
+        metrics['total_citations'], profiles.count
+    ),
+    'median_citations': lambda profiles, citations, metrics: citations[
+        profiles.citation_offsets[:-1] + profiles.count // 2
+    ],
+    'h_index': _h_index,
+    # One point each for 10+ publications, median citations of 5+ and an ORCID
+    'score': lambda profiles, citations, metrics: (
+        (profiles.count >= 10).astype(np.int32) + (metrics['median_citations'] >= 5) + (profiles.orcid >= 0)
+    )
+}
+
+def profile_metrics(profiles):
+    """Compute every PROFILE_METRICS array for the profiles"""
+    segments = np.repeat(np.arange(len(profiles)), profiles.count)
+    citations = profiles.citations[np.lexsort((profiles.citations, segments))]
+    metrics = {}
+    for name, metric in PROFILE_METRICS.items():
+        metrics[name] = metric(profiles, citations, metrics)
+    return metrics
+
+# Metrics ranked by, in decreasing order, per "Sort By" option
+SORT_KEYS = {
+    "Count": ('count',),
+    "Average Citations": ('average_citations',),
+    "Median Citations": ('median_citations',),
+    "Score": ('score', 'count'),
+    "H-index": ('h_index',),
+    "Total Citations": ('total_citations',)
+}
+
+def build_result_row(profiles, i):
+    """Display fields of one ranked author"""
+    corpus = profiles.corpus
+    metrics = profiles.metrics()
+    
+    top_country = profiles.countries.top(i)
+    country_code = corpus.countries[top_country[0]] if len(top_country) else ''
+    
+    return {
+        'Author': profiles.display_name(i),
+        'Count': int(profiles.count[i]),
+        'Median Citations': int(metrics['median_citations'][i]),
+        'Average Citations': float(metrics['average_citations'][i]),
+        'H-index': int(metrics['h_index'][i]),
+        'Total Citations': int(metrics['total_citations'][i]),
+        'Country': get_country_name(country_code),
+        'Continent': get_continent(country_code),
+        'Top Topics': ', '.join([corpus.topics[t] for t in profiles.topics.top(i).tolist()]),
+        'Top Co-authors': ', '.join([corpus.authors[c] for c in profiles.coauthors.top(i).tolist()]),
+        'Top Journals': ', '.join([corpus.journals[j] for j in profiles.journals.top(i).tolist()]),
+        'ORCID': corpus.orcids[profiles.orcid[i]] if profiles.orcid[i] >= 0 else '',
+        'OpenAlex ID': corpus.openalex_ids[profiles.openalex_id[i]] if profiles.openalex_id[i] >= 0 else '',
+        'Score': int(metrics['score'][i])
+    }
+
+def iter_results(profiles, min_articles=1, author_search=None, sort_by="Count", max_results=None,
+                 fuzzy_authors=False):
+    """Rank author profiles, yielding result rows lazily in rank order
+    
+    Candidates are ranked in one stable sort over their precomputed metrics
+    (ties keep profile order). With max_results, a partition on the first
+    metric first narrows them to the top max_results plus any ties at the
+    boundary, so only those are sorted, and display fields are built for the
+    top max_results only, as they are consumed. Profiles are only read, so this
+    can run repeatedly over cached aggregates. With fuzzy_authors, the author
+    search also matches similar spellings (see AuthorNameIndex.match).
+    """
+    author_search = author_search.lower() if author_search else None
+    
+    candidates = np.flatnonzero(profiles.count >= min_articles)
+    
+    # Author name filter
+    if author_search and fuzzy_authors:
+        keys = profiles.corpus.author_index.match(author_search, fuzzy=True)
+        candidates = candidates[np.isin(profiles.key[candidates], keys)]
+    elif author_search:
+        candidates = np.array([
+            i for i in candidates.tolist()
+            if author_search in profiles.name(i).lower() or author_search in profiles.display_name(i).lower()
+        ], dtype=np.int64)
+    
+    sort_key = SORT_KEYS.get(sort_by)
+    if sort_key is not None:
+        metrics = profiles.metrics()
+        if max_results is not None and 0 < max_results < len(candidates):
+            primary = -metrics[sort_key[0]][candidates]
+            boundary = np.partition(primary, max_results - 1)[max_results - 1]
+            candidates = candidates[primary <= boundary]
+        # np.lexsort sorts by its last key first
+        candidates = candidates[np.lexsort(
+            [candidates] + [-metrics[name][candidates] for name in reversed(sort_key)]
+        )]
+    
+    for i in candidates[:max_results].tolist():
+        yield build_result_row(profiles, i)
+
+def build_results(profiles, min_articles=1, author_search=None, sort_by="Count", max_results=None,
+                  fuzzy_authors=False):
+    """Rank author profiles into a list of result rows"""
+    return list(iter_results(profiles, min_articles, author_search, sort_by, max_results, fuzzy_authors))
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+# Default memory budget of a ResultCache
+RESULT_CACHE_BYTES = 64 * 2**20
+
+def normalize_search_term(term):
+    """Lowercase and trim a search box entry; empty entries become None"""
+    return (term or '').strip().lower() or None
+
+def estimate_rows_size(rows):
+    """Approximate memory held by a list of result rows, in bytes"""
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values()) for row in rows
+    )
+
+class ResultCache:
+    """Thread-safe LRU cache of result rows, bounded by their estimated size
+    
+    Keys are built by the caller from the corpus content hash and normalized
+    search parameters. Cached rows are shared between callers and must not be
+    modified. hits and misses count get() calls.
+    """
+    def __init__(self, max_bytes=RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Cached rows for key (marking them recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, rows):
+        """Cache rows under key, evicting the least recently used to fit"""
+        size = estimate_rows_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (rows, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self.size -= self._entries.popitem(last=False)[1][1]
+    
+    def __len__(self):
+        return len(self._entries)
+
+# ============================================================================
+# RESULT EXPORT
+# ============================================================================
+
+RESULT_COLUMNS = [
+    'Author', 'Count', 'Median Citations', 'Average Citations', 'H-index', 'Total Citations',
+    'Country', 'Continent', 'Top Topics', 'Top Co-authors', 'Top Journals', 'ORCID', 'OpenAlex ID', 'Score'
+]
+
+def write_results_xlsx(rows, fileobj, columns=RESULT_COLUMNS):
+    """Stream result rows into an .xlsx file using openpyxl's write-only mode"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Author Search Results')
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([row[column] for column in columns])
+    workbook.save(fileobj)
+
+def write_results_csv(rows, fileobj, columns=RESULT_COLUMNS):
+    """Stream result rows into a UTF-8 .csv file"""
+    text = TextIOWrapper(fileobj, encoding='utf-8', newline='')
+    writer = csv.DictWriter(text, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+    text.detach()
+
+def write_results_jsonl(rows, fileobj, columns=RESULT_COLUMNS):
+    """Stream result rows into a .jsonl file, one JSON object per row"""
+    for row in rows:
+        fileobj.write(json.dumps({column: row[column] for column in columns}).encode('utf-8') + b'\n')
+
+# File extension -> (writer, MIME type)
+EXPORT_FORMATS = {
+    'xlsx': (write_results_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': (write_results_csv, 'text/csv')
+}
+
+def export_results(rows, file_format):
+    """Write result rows in one of EXPORT_FORMATS and return the file bytes"""
+    writer, _ = EXPORT_FORMATS[file_format]
+    output = BytesIO()
+    writer(rows, output)
+    return output.getvalue()
+
+
+# ============================================================================
+# CORPUS SNAPSHOTS
+# ============================================================================
+
+# Bump whenever the snapshot layout changes, so older snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+
+_SNAPSHOT_VOCABULARIES = ('journals', 'topics', 'authors', 'orcids', 'openalex_ids', 'countries')
+_SNAPSHOT_ARRAYS = ('work_journal', 'work_topic', 'work_citations', 'authorship_offsets',
+                    'authorship_author', 'authorship_orcid', 'authorship_openalex_id',
+                    'country_offsets', 'authorship_country')
+_SNAPSHOT_INDEXES = ('topic_index', 'journal_index', 'country_index')
+
+def save_snapshot(corpus, directory, content_hash, **metadata):
+    """Write a compiled corpus as a directory of .npy columns plus JSON vocabularies
+    
+    The snapshot is written next to its final location and moved into place,
+    with the manifest written last, so a partial write is never opened.
+    """
+    staging = directory + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    
+    for field in _SNAPSHOT_ARRAYS:
+        np.save(os.path.join(staging, f"{field}.npy"), getattr(corpus, field))
+    for field in _SNAPSHOT_INDEXES:
+        index = getattr(corpus, field)
+        np.save(os.path.join(staging, f"{field}.offsets.npy"), index.offsets)
+        np.save(os.path.join(staging, f"{field}.postings.npy"), index.postings)
+    with open(os.path.join(staging, 'vocabularies.json'), 'w', encoding='utf-8') as f:
+        json.dump({field: getattr(corpus, field) for field in _SNAPSHOT_VOCABULARIES}, f)
+    corpus.name_table.save(os.path.join(staging, 'names.json'))
+    
+    manifest = dict(metadata, version=SNAPSHOT_VERSION, content_hash=content_hash, n_works=corpus.n_works)
+    with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+
+def read_snapshot_manifest(directory):
+    """The manifest of a snapshot, or None when missing, unreadable or outdated"""
+    try:
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == SNAPSHOT_VERSION else None
+
+def _load_array(path):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:  # empty arrays cannot be memory-mapped
+        return np.load(path)
+
+def load_snapshot(directory, content_hash=None):
+    """Open a snapshot with memory-mapped columns, or None when missing or stale"""
+    manifest = read_snapshot_manifest(directory)
+    if manifest is None or (content_hash and manifest['content_hash'] != content_hash):
+        return None
+    
+    with open(os.path.join(directory, 'vocabularies.json'), encoding='utf-8') as f:
+        vocabularies = json.load(f)
+    arrays = {field: _load_array(os.path.join(directory, f"{field}.npy")) for field in _SNAPSHOT_ARRAYS}
+    indexes = tuple(
+        InvertedIndex(
+            _load_array(os.path.join(directory, f"{field}.offsets.npy")),
+            _load_array(os.path.join(directory, f"{field}.postings.npy"))
+        )
+        for field in _SNAPSHOT_INDEXES
+    )
+    name_table = NameTable.load(os.path.join(directory, 'names.json'))
+    return Corpus(**vocabularies, **arrays, name_table=name_table, indexes=indexes)
+
+def _directory_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+def prune_snapshots(snapshot_dir, max_bytes, keep=()):
+    """Delete the oldest snapshots until the rest take up at most max_bytes
+    
+    Snapshots are deleted in order of their manifest's created time, those
+    of an outdated layout first; the content hashes in keep are never
+    deleted, nor directories without a manifest. Returns the deleted
+    directories.
+    """
+    snapshots = []
+    for name in os.listdir(snapshot_dir):
+        directory = os.path.join(snapshot_dir, name)
+        try:
+            with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            size = _directory_size(directory)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(manifest, dict):
+            continue
+        current = manifest.get('version') == SNAPSHOT_VERSION
+        snapshots.append((current, manifest.get('created', 0) if current else 0, name, size))
+    
+    total = sum(size for *_, size in snapshots)
+    deleted = []
+    for _, _, name, size in sorted(snapshots):
+        if total <= max_bytes:
+            break
+        if name not in keep:
+            directory = os.path.join(snapshot_dir, name)
+            shutil.rmtree(directory, ignore_errors=True)
+            deleted.append(directory)
+            total -= size
+    return deleted
+
+# ============================================================================
+# DATA LOADING
+# ============================================================================
+
+# Directory of corpus snapshots, one per export content hash
+# (set AUTHOR_SEARCH_CACHE_DIR to an empty string to disable)
+DEFAULT_SNAPSHOT_DIR = os.environ.get('AUTHOR_SEARCH_CACHE_DIR', '.author_search_cache')
+
+# Disk space the snapshots of a directory may take up before the oldest are
+# deleted (set AUTHOR_SEARCH_CACHE_MB to change); a 1M-work export takes about 240 MB
+SNAPSHOT_DIR_MAX_BYTES = int(os.environ.get('AUTHOR_SEARCH_CACHE_MB', '2048')) * 2**20
+
+# How often (in works) the loading progress bar is refreshed
+PROGRESS_EVERY = 1000
+
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+class ByteCountingReader:
+    """File wrapper that records how many bytes have been read so far"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.bytes_read = 0
+        self.pending = b''
+
+    def read(self, size=-1):
+        if self.pending:
+            # Bytes put back by peek_start were counted when first read
+            if size is None or size < 0:
+                rest = self.fileobj.read()
+                self.bytes_read += len(rest)
+                chunk, self.pending = self.pending + rest, b''
+            else:
+                chunk, self.pending = self.pending[:size], self.pending[size:]
+            return chunk
+        chunk = self.fileobj.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def peek_start(self, chunk_size=1 << 16):
+        """First non-whitespace byte of the stream (b'' if there is none), without consuming it"""
+        head = b''
+        while True:
+            chunk = self.read(chunk_size)
+            head += chunk
+            start = head.removeprefix(codecs.BOM_UTF8).lstrip()[:1]
+            if start or not chunk:
+                break
+        self.pending = head + self.pending
+        return start
+
+def _pick(mapping, keys):
+    return {key: mapping[key] for key in keys if key in mapping}
+
+def slim_work(work):
+    """Keep only the fields of a work that the author search reads"""
+    slim = _pick(work, ('id', 'cited_by_count'))
+    
+    primary_loc = work.get('primary_location')
+    if primary_loc:
+        source = primary_loc.get('source')
+        slim['primary_location'] = {'source': _pick(source, ('display_name',))} if source else {}
+    
+    topic = work.get('primary_topic')
+    if topic:
+        slim['primary_topic'] = _pick(topic, ('display_name',))
+    
+    slim['authorships'] = [
+        {
+            'author': _pick(authorship.get('author') or {}, ('display_name', 'orcid', 'id')),
+            'countries': authorship.get('countries') or []
+        }
+        for authorship in work.get('authorships') or []
+    ]
+    return slim
+
+def iter_works(fileobj, on_progress=None):
+    """Stream slimmed works out of a JSON array export, one at a time
+    
+    on_progress, if given, is called periodically with the number of bytes consumed.
+    Raises ValueError if the export is not a JSON array of objects.
+    """
+    reader = ByteCountingReader(fileobj)
+    if reader.peek_start() != b'[':
+        raise ValueError("expected a JSON array of works")
+    if ijson:
+        works = ijson.items(reader, 'item', use_float=True)
+    else:
+        works = json.load(reader)
+    
+    for i, work in enumerate(works, 1):
+        if not isinstance(work, dict):
+            raise ValueError(f"work {i} is not a JSON object")
+        yield slim_work(work)
+        if on_progress and i % PROGRESS_EVERY == 0:
+            on_progress(reader.bytes_read)
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_snapshots(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Manifests of the saved snapshots, newest first"""
+    if not snapshot_dir or not os.path.isdir(snapshot_dir):
+        return []
+    manifests = [read_snapshot_manifest(os.path.join(snapshot_dir, name)) for name in os.listdir(snapshot_dir)]
+    return sorted((m for m in manifests if m), key=lambda m: m.get('created', 0), reverse=True)
+
+def combine_content_hashes(content_hashes):
+    """Content hash of a set of exports, independent of their order
+    
+    A single export keeps its own hash, so its snapshot is shared with
+    loading it on its own.
+    """
+    content_hashes = sorted(set(content_hashes))
+    if len(content_hashes) == 1:
+        return content_hashes[0]
+    return hashlib.sha256('\n'.join(content_hashes).encode()).hexdigest()
+
+def _open_source(source):
+    """Open an export given as a path or as the bytes of the file"""
+    return open(source, 'rb') if isinstance(source, str) else BytesIO(source)
+
+def _source_size(source):
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+def _compile_source(source, on_progress=None):
+    """Parse one export into a CorpusBuilder (run in worker processes)"""
+    builder = CorpusBuilder()
+    with _open_source(source) as f:
+        for work in iter_works(f, on_progress):
+            builder.add(work)
+    return builder
+
+def compile_sources(sources, on_progress=None, instrumentation=None, workers=None):
+    """Compile several exports into one Corpus, skipping works repeated across them
+    
+    sources are paths or file contents (bytes). With more than one source
+    they are parsed concurrently in up to `workers` processes (default: one
+    per source, at most one per CPU) and merged in the order given, so the
+    corpus does not depend on which file finishes first. on_progress, if
+    given, is called with the fraction of the input parsed so far.
+    """
+    if workers is None:
+        workers = min(len(sources), os.cpu_count() or 1)
+    
+    def merged(builders, file_progress=None):
+        builder = None
+        for i, part in enumerate(builders, 1):
+            if builder is None:
+                builder = part
+            else:
+                builder.merge(part)
+            if file_progress:
+                file_progress(i / len(sources))
+        return builder
+    
+    with _stage(instrumentation, 'parse'):
+        if len(sources) == 1 or workers <= 1:
+            sizes = [_source_size(source) for source in sources]
+            total = max(sum(sizes), 1)
+            
+            def compiled(source, done):
+                progress = on_progress and (lambda bytes_read: on_progress((done + bytes_read) / total))
+                return _compile_source(source, progress)
+            
+            builder = merged(compiled(source, sum(sizes[:i])) for i, source in enumerate(sources))
+        else:
+            # Not forked: the workers must not inherit the threads and memory of the caller
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+                futures = [pool.submit(_compile_source, source) for source in sources]
+                builder = merged((future.result() for future in futures), on_progress)
+    
+    if instrumentation:
+        instrumentation.count('files_loaded', len(sources))
+    return builder.build(instrumentation=instrumentation)
+
+def load_or_compile_corpus(content_hash, sources=None, snapshot_dir=DEFAULT_SNAPSHOT_DIR, file_name=None,
+                           on_progress=None, instrumentation=None, max_snapshot_bytes=SNAPSHOT_DIR_MAX_BYTES):
+    """Memory-map the snapshot of one or more exports, or parse, compile and snapshot them
+    
+    sources (paths or file contents, see compile_sources) are only read when
+    snapshot_dir holds no valid snapshot for content_hash; snapshots are
+    written best effort, after which the oldest others are deleted to keep
+    snapshot_dir within max_snapshot_bytes.
+    """
+    directory = os.path.join(snapshot_dir, content_hash) if snapshot_dir else None
+    with _stage(instrumentation, 'open snapshot'):
+        corpus = load_snapshot(directory, content_hash) if directory else None
+    
+    if corpus is None:
+        if not sources:
+            raise FileNotFoundError(f"No saved snapshot for {content_hash}")
+        corpus = compile_sources(sources, on_progress, instrumentation)
+        
+        if directory:
+            try:
+                os.makedirs(snapshot_dir, exist_ok=True)
+                with _stage(instrumentation, 'save snapshot'):
+                    save_snapshot(corpus, directory, content_hash, file_name=file_name, created=time.time())
+                prune_snapshots(snapshot_dir, max_snapshot_bytes, keep=(content_hash,))
+            except OSError:
+                pass  # snapshots are best effort
+    elif instrumentation:
+        instrumentation.count('works_loaded', corpus.n_works)
+    return corpus
+
+def open_corpus(paths, snapshot_dir=DEFAULT_SNAPSHOT_DIR, instrumentation=None):
+    """Open JSON exports as one corpus (through its snapshot when there is one), or a snapshot directory"""
+    if isinstance(paths, str):
+        paths = [paths]
+    if len(paths) == 1 and os.path.isdir(paths[0]):
+        with _stage(instrumentation, 'open snapshot'):
+            corpus = load_snapshot(paths[0])
+        if corpus is None:
+            raise ValueError(f"{paths[0]} is not a valid corpus snapshot")
+        return corpus
+    
+    hashes = {hash_file(path): path for path in paths}
+    paths = [hashes[content_hash] for content_hash in sorted(hashes)]
+    return load_or_compile_corpus(combine_content_hashes(hashes), paths, snapshot_dir,
+                                  ' + '.join(os.path.basename(path) for path in paths),
+                                  instrumentation=instrumentation)
+
+# ============================================================================
+# BATCH SEARCH
+# ============================================================================
+
+# Fields of a query spec and their values when omitted (max_results and
+# coauthor_cap of 0 mean no limit)
+QUERY_DEFAULTS = {
+    'topic': '',
+    'journal': '',
+    'country': '',
+    'author': '',
+    'fuzzy_author': False,
+    'min_articles': 3,
+    'sort_by': 'Count',
+    'max_results': 50,
+    'coauthor_cap': DEFAULT_COAUTHOR_CAP
+}
+
+# Distinct filter combinations whose profiles are kept during a batch
+BATCH_CACHED_PROFILES = 16
+
+def read_queries(path):
+    """Query specs from a .jsonl or .csv file, with QUERY_DEFAULTS filled in"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            specs = list(csv.DictReader(f))
+        else:
+            specs = [json.loads(line) for line in f if line.strip()]
+    
+    queries = []
+    for number, spec in enumerate(specs, 1):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Query {number}: expected a JSON object")
+        if None in spec:  # csv.DictReader's key for values beyond the header
+            raise ValueError(f"Query {number}: more values than columns")
+        unknown = set(spec) - set(QUERY_DEFAULTS) - {'id'}
+        if unknown:
+            raise ValueError(f"Query {number}: unknown fields {', '.join(sorted(unknown))}")
+        
+        query = dict(QUERY_DEFAULTS, id=str(number))
+        query.update((field, value) for field, value in spec.items() if value not in ('', None))
+        for field in ('topic', 'journal', 'country', 'author', 'sort_by'):
+            if not isinstance(query[field], str):
+                raise ValueError(f"Query {number}: {field} must be a string, not {query[field]!r}")
+        for field in ('min_articles', 'max_results', 'coauthor_cap'):
+            try:
+                query[field] = int(query[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"Query {number}: {field} must be an integer, not {query[field]!r}") from None
+        query['fuzzy_author'] = str(query['fuzzy_author']).lower() in ('true', '1', 'yes')
+        if query['sort_by'] not in SORT_KEYS:
+            raise ValueError(f"Query {number}: sort_by must be one of {', '.join(SORT_KEYS)}")
+        queries.append(query)
+    return queries
+
+def run_queries(corpus, queries, instrumentation=None, workers=None):
+    """Yield (query, result rows) for each query spec against one corpus
+    
+    Queries with the same filters share their filtering and aggregation;
+    workers is passed on to aggregate_author_profiles.
+    """
+    @lru_cache(maxsize=BATCH_CACHED_PROFILES)
+    def profiles_for(topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors, coauthor_cap):
+        work_ids = filter_works(corpus, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors,
+                                instrumentation)
+        return aggregate_author_profiles(corpus, work_ids, coauthor_cap, instrumentation, workers)
+    
+    for query in queries:
+        author_filter = normalize_search_term(query['author'])
+        profiles = profiles_for(
+            normalize_search_term(query['topic']),
+            normalize_search_term(query['journal']),
+            normalize_search_term(query['country']),
+            author_filter,
+            query['fuzzy_author'],
+            query['coauthor_cap'] or None
+        )
+        yield query, iter_results(
+            profiles, query['min_articles'], author_filter, query['sort_by'], query['max_results'] or None,
+            query['fuzzy_author']
+        )
+
+# File extension -> writer for batch output
+BATCH_FORMATS = {
+    'jsonl': write_results_jsonl,
+    'csv': write_results_csv,
+    'xlsx': write_results_xlsx
+}
+
+def write_batch_results(results, path):
+    """Write the rows of every query to one file, tagged with the query id"""
+    writer = BATCH_FORMATS[os.path.splitext(path)[1].lstrip('.').lower()]
+    rows = ({'Query': query['id'], **row} for query, query_rows in results for row in query_rows)
+    with open(path, 'wb') as f:
+        writer(rows, f, ['Query'] + RESULT_COLUMNS)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m openalex_author_search',
+        description="Run OpenAlex author searches without the Streamlit page"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    search = commands.add_parser('search', help="run a file of author searches against one corpus")
+    search.add_argument('corpus', nargs='+',
+                        help="JSON exports (loaded as one corpus, without duplicate works), or a snapshot directory")
+    search.add_argument('queries', help=".jsonl or .csv file of query specs")
+    search.add_argument('-o', '--output', required=True,
+                        help=f"results file ({', '.join('.' + ext for ext in BATCH_FORMATS)})")
+    search.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR,
+                        help="where JSON exports are snapshotted ('' to disable, default: %(default)s)")
+    search.add_argument('--timings', action='store_true',
+                        help="log per-stage timings and counters to stderr as JSON lines")
+    search.add_argument('--track-memory', action='store_true',
+                        help="with --timings, also log the peak memory of each stage (slower)")
+    search.add_argument('--workers', type=int, default=None,
+                        help="aggregation threads (default: one per CPU for large searches)")
+    args = parser.parse_args(argv)
+    
+    if os.path.splitext(args.output)[1].lstrip('.').lower() not in BATCH_FORMATS:
+        parser.error(f"--output must end in one of {', '.join('.' + ext for ext in BATCH_FORMATS)}")
+    
+    instrumentation = None
+    if args.timings:
+        logging.basicConfig(stream=sys.stderr, format='%(message)s')
+        logger.setLevel(logging.INFO)
+        instrumentation = Instrumentation(track_memory=args.track_memory)
+    
+    try:
+        queries = read_queries(args.queries)
+        start = time.perf_counter()
+        corpus = open_corpus(args.corpus, args.snapshot_dir, instrumentation)
+        loaded = time.perf_counter()
+        write_batch_results(run_queries(corpus, queries, instrumentation, args.workers), args.output)
+    except (OSError, ValueError) + JSON_ERRORS as e:
+        parser.exit(1, f"error: {e}\n")
+    
+    if instrumentation:
+        instrumentation.log_counters()
+    
+    print(f"Loaded {corpus.n_works:,} works in {loaded - start:.1f}s, "
+          f"ran {len(queries):,} queries in {time.perf_counter() - loaded:.1f}s", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
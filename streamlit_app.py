@@ -1,9 +1,24 @@
 import streamlit as st
-import json
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
 import pandas as pd
-from io import BytesIO
-from collections import defaultdict, Counter
-import unicodedata
+import numpy as np
+
+from openalex_author_search import (
+    DEFAULT_COAUTHOR_CAP, DEFAULT_SNAPSHOT_DIR, EXPORT_FORMATS, JSON_ERRORS, SORT_KEYS, Instrumentation, ResultCache,
+    aggregate_author_profiles, build_results, export_results, filter_works,
+    combine_content_hashes, iter_results, list_snapshots, load_or_compile_corpus, logger, normalize_search_term
+)
+
+# Stage timings are logged as JSON lines to the server's stderr
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
 
 # Configure page
 st.set_page_config(
@@ -36,225 +51,102 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ============================================================================
-# UTILITY FUNCTIONS (from your existing code)
+# DATA LOADING
 # ============================================================================
 
-def normalize_author_name(name):
-    """Normalize author names to handle accents and dashes"""
-    if not name:
-        return name
-    
-    normalized = unicodedata.normalize('NFD', name)
-    ascii_name = normalized.encode('ascii', 'ignore').decode('ascii')
-    
-    ascii_name = ascii_name.replace('–', '-')
-    ascii_name = ascii_name.replace('—', '-')
-    ascii_name = ascii_name.replace('−', '-')
-    ascii_name = ascii_name.replace('‐', '-')
-    ascii_name = ascii_name.replace('‑', '-')
-    
-    ascii_name = ' '.join(ascii_name.split())
+# Number of parsed corpora kept in memory across reruns and sessions
+MAX_CACHED_CORPORA = 2
+
+# Whether the page offers to reopen any saved snapshot without uploading.
+# Snapshots are shared by every visitor, so this is only for single-user
+# deployments (set AUTHOR_SEARCH_LIST_SNAPSHOTS=1); uploads always reuse the
+# snapshot of the same files.
+LIST_SAVED_SNAPSHOTS = os.environ.get('AUTHOR_SEARCH_LIST_SNAPSHOTS') == '1'
+
+def compute_content_hash(uploaded_file):
+    """Hash the uploaded file contents, once per upload per session"""
+    hashes = st.session_state.setdefault('content_hashes', {})
+    if uploaded_file.file_id not in hashes:
+        hashes[uploaded_file.file_id] = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+    return hashes[uploaded_file.file_id]
+
+@st.cache_resource(max_entries=MAX_CACHED_CORPORA, show_spinner=False)
+def corpus_slot(content_hash):
+    """Cache slot holding the parsed corpus for one distinct file"""
+    return {}
+
+def load_corpus(content_hash, uploaded_files=(), on_progress=None, track_memory=False):
+    """Open or compile the corpus of one or more exports once per distinct set of files
     
-    return ascii_name.strip()
+    A saved snapshot for the content hash is memory-mapped instead of parsing
+    the JSON; otherwise the uploads are streamed to temporary files, parsed
+    concurrently from there, merged without duplicate works, compiled and
+    snapshotted. Parsing
+    happens outside the cached function so that progress updates are not
+    recorded and replayed by Streamlit on later cache hits. Returns the corpus
+    and the Instrumentation of the load that produced it.
+    """
+    slot = corpus_slot(content_hash)
+    if 'corpus' not in slot:
+        instrumentation = Instrumentation(track_memory)
+        # Parser processes read the files by path rather than receiving a copy of each upload
+        with tempfile.TemporaryDirectory() as upload_dir:
+            paths = []
+            for i, uploaded_file in enumerate(uploaded_files):
+                paths.append(os.path.join(upload_dir, f'{i}.json'))
+                uploaded_file.seek(0)
+                with open(paths[-1], 'wb') as f:
+                    shutil.copyfileobj(uploaded_file, f)
+            slot['corpus'] = load_or_compile_corpus(
+                content_hash, paths, DEFAULT_SNAPSHOT_DIR,
+                file_name=' + '.join(f.name for f in uploaded_files) or None,
+                on_progress=on_progress, instrumentation=instrumentation
+            )
+        instrumentation.log_counters()
+        slot['instrumentation'] = instrumentation
+    return slot['corpus'], slot['instrumentation']
 
-COUNTRY_CODES = {
-    'AD': 'Andorra', 'AL': 'Albania', 'AM': 'Armenia', 'AT': 'Austria',
-    'AX': 'Åland Islands', 'BA': 'Bosnia and Herzegovina', 'BE': 'Belgium',
-    'BG': 'Bulgaria', 'BY': 'Belarus', 'CH': 'Switzerland', 'CY': 'Cyprus',
-    'CZ': 'Czech Republic', 'DE': 'Germany', 'DK': 'Denmark', 'EE': 'Estonia',
-    'ES': 'Spain', 'FI': 'Finland', 'FO': 'Faroe Islands', 'FR': 'France',
-    'GB': 'United Kingdom', 'UK': 'United Kingdom', 'GE': 'Georgia',
-    'GG': 'Guernsey', 'GI': 'Gibraltar', 'GR': 'Greece', 'HR': 'Croatia',
-    'HU': 'Hungary', 'IE': 'Ireland', 'IM': 'Isle of Man', 'IS': 'Iceland',
-    'IT': 'Italy', 'JE': 'Jersey', 'LI': 'Liechtenstein', 'LT': 'Lithuania',
-    'LU': 'Luxembourg', 'LV': 'Latvia', 'MC': 'Monaco', 'MD': 'Moldova',
-    'ME': 'Montenegro', 'MK': 'North Macedonia', 'MT': 'Malta', 'NL': 'Netherlands',
-    'NO': 'Norway', 'PL': 'Poland', 'PT': 'Portugal', 'RO': 'Romania',
-    'RS': 'Serbia', 'RU': 'Russia', 'SE': 'Sweden', 'SI': 'Slovenia',
-    'SJ': 'Svalbard and Jan Mayen', 'SK': 'Slovakia', 'SM': 'San Marino',
-    'UA': 'Ukraine', 'VA': 'Vatican City', 'XK': 'Kosovo',
-    'AE': 'United Arab Emirates', 'AF': 'Afghanistan', 'AZ': 'Azerbaijan',
-    'BD': 'Bangladesh', 'BH': 'Bahrain', 'BN': 'Brunei', 'BT': 'Bhutan',
-    'CN': 'China', 'HK': 'Hong Kong', 'ID': 'Indonesia', 'IL': 'Israel',
-    'IN': 'India', 'IQ': 'Iraq', 'IR': 'Iran', 'JO': 'Jordan', 'JP': 'Japan',
-    'KG': 'Kyrgyzstan', 'KH': 'Cambodia', 'KP': 'North Korea', 'KR': 'South Korea',
-    'KW': 'Kuwait', 'KZ': 'Kazakhstan', 'LA': 'Laos', 'LB': 'Lebanon',
-    'LK': 'Sri Lanka', 'MM': 'Myanmar', 'MN': 'Mongolia', 'MO': 'Macau',
-    'MV': 'Maldives', 'MY': 'Malaysia', 'NP': 'Nepal', 'OM': 'Oman',
-    'PH': 'Philippines', 'PK': 'Pakistan', 'PS': 'Palestine', 'QA': 'Qatar',
-    'SA': 'Saudi Arabia', 'SG': 'Singapore', 'SY': 'Syria', 'TH': 'Thailand',
-    'TJ': 'Tajikistan', 'TL': 'Timor-Leste', 'TM': 'Turkmenistan', 'TR': 'Turkey',
-    'TW': 'Taiwan', 'UZ': 'Uzbekistan', 'VN': 'Vietnam', 'YE': 'Yemen',
-    'AO': 'Angola', 'BF': 'Burkina Faso', 'BI': 'Burundi', 'BJ': 'Benin',
-    'BW': 'Botswana', 'CD': 'Democratic Republic of the Congo',
-    'CF': 'Central African Republic', 'CG': 'Republic of the Congo',
-    'CI': 'Ivory Coast', 'CM': 'Cameroon', 'CV': 'Cape Verde', 'DJ': 'Djibouti',
-    'DZ': 'Algeria', 'EG': 'Egypt', 'EH': 'Western Sahara', 'ER': 'Eritrea',
-    'ET': 'Ethiopia', 'GA': 'Gabon', 'GH': 'Ghana', 'GM': 'Gambia',
-    'GN': 'Guinea', 'GQ': 'Equatorial Guinea', 'GW': 'Guinea-Bissau',
-    'KE': 'Kenya', 'KM': 'Comoros', 'LR': 'Liberia', 'LS': 'Lesotho',
-    'LY': 'Libya', 'MA': 'Morocco', 'MG': 'Madagascar', 'ML': 'Mali',
-    'MR': 'Mauritania', 'MU': 'Mauritius', 'MW': 'Malawi', 'MZ': 'Mozambique',
-    'NA': 'Namibia', 'NE': 'Niger', 'NG': 'Nigeria', 'RE': 'Réunion',
-    'RW': 'Rwanda', 'SC': 'Seychelles', 'SD': 'Sudan', 'SL': 'Sierra Leone',
-    'SN': 'Senegal', 'SO': 'Somalia', 'SS': 'South Sudan',
-    'ST': 'São Tomé and Príncipe', 'SZ': 'Eswatini', 'TD': 'Chad', 'TG': 'Togo',
-    'TN': 'Tunisia', 'TZ': 'Tanzania', 'UG': 'Uganda', 'YT': 'Mayotte',
-    'ZA': 'South Africa', 'ZM': 'Zambia', 'ZW': 'Zimbabwe',
-    'AG': 'Antigua and Barbuda', 'AI': 'Anguilla', 'AW': 'Aruba',
-    'BB': 'Barbados', 'BL': 'Saint Barthélemy', 'BM': 'Bermuda',
-    'BQ': 'Caribbean Netherlands', 'BS': 'Bahamas', 'BZ': 'Belize',
-    'CA': 'Canada', 'CR': 'Costa Rica', 'CU': 'Cuba', 'CW': 'Curaçao',
-    'DM': 'Dominica', 'DO': 'Dominican Republic', 'GD': 'Grenada',
-    'GL': 'Greenland', 'GP': 'Guadeloupe', 'GT': 'Guatemala', 'HN': 'Honduras',
-    'HT': 'Haiti', 'JM': 'Jamaica', 'KN': 'Saint Kitts and Nevis',
-    'KY': 'Cayman Islands', 'LC': 'Saint Lucia', 'MF': 'Saint Martin',
-    'MQ': 'Martinique', 'MS': 'Montserrat', 'MX': 'Mexico', 'NI': 'Nicaragua',
-    'PA': 'Panama', 'PM': 'Saint Pierre and Miquelon', 'PR': 'Puerto Rico',
-    'SV': 'El Salvador', 'SX': 'Sint Maarten', 'TC': 'Turks and Caicos Islands',
-    'TT': 'Trinidad and Tobago', 'US': 'United States',
-    'VC': 'Saint Vincent and the Grenadines', 'VG': 'British Virgin Islands',
-    'VI': 'U.S. Virgin Islands',
-    'AR': 'Argentina', 'BO': 'Bolivia', 'BR': 'Brazil', 'CL': 'Chile',
-    'CO': 'Colombia', 'EC': 'Ecuador', 'FK': 'Falkland Islands',
-    'GF': 'French Guiana', 'GY': 'Guyana', 'PE': 'Peru', 'PY': 'Paraguay',
-    'SR': 'Suriname', 'UY': 'Uruguay', 'VE': 'Venezuela',
-    'AS': 'American Samoa', 'AU': 'Australia', 'CK': 'Cook Islands',
-    'FJ': 'Fiji', 'FM': 'Micronesia', 'GU': 'Guam', 'KI': 'Kiribati',
-    'MH': 'Marshall Islands', 'MP': 'Northern Mariana Islands',
-    'NC': 'New Caledonia', 'NF': 'Norfolk Island', 'NR': 'Nauru', 'NU': 'Niue',
-    'NZ': 'New Zealand', 'PF': 'French Polynesia', 'PG': 'Papua New Guinea',
-    'PN': 'Pitcairn Islands', 'PW': 'Palau', 'SB': 'Solomon Islands',
-    'TK': 'Tokelau', 'TO': 'Tonga', 'TV': 'Tuvalu',
-    'UM': 'U.S. Minor Outlying Islands', 'VU': 'Vanuatu',
-    'WF': 'Wallis and Futuna', 'WS': 'Samoa'
-}
+# ============================================================================
+# CACHED SEARCH STAGES
+# ============================================================================
 
-CONTINENT_MAP = {
-    'Europe': ['AD', 'AL', 'AT', 'AX', 'BA', 'BE', 'BG', 'BY', 'CH', 'CY',
-               'CZ', 'DE', 'DK', 'EE', 'ES', 'FI', 'FO', 'FR', 'GB', 'UK',
-               'GG', 'GI', 'GR', 'HR', 'HU', 'IE', 'IM', 'IS', 'IT', 'JE',
-               'LI', 'LT', 'LU', 'LV', 'MC', 'MD', 'ME', 'MK', 'MT', 'NL',
-               'NO', 'PL', 'PT', 'RO', 'RS', 'SE', 'SI', 'SJ', 'SK', 'SM',
-               'UA', 'VA', 'XK'],
-    'Asia': ['AE', 'AF', 'AM', 'AZ', 'BD', 'BH', 'BN', 'BT', 'CN', 'GE',
-             'HK', 'ID', 'IL', 'IN', 'IQ', 'IR', 'JO', 'JP', 'KG', 'KH',
-             'KP', 'KR', 'KW', 'KZ', 'LA', 'LB', 'LK', 'MM', 'MN', 'MO',
-             'MV', 'MY', 'NP', 'OM', 'PH', 'PK', 'PS', 'QA', 'SA', 'SG',
-             'SY', 'TH', 'TJ', 'TL', 'TM', 'TR', 'TW', 'UZ', 'VN', 'YE'],
-    'Africa': ['AO', 'BF', 'BI', 'BJ', 'BW', 'CD', 'CF', 'CG', 'CI', 'CM',
-               'CV', 'DJ', 'DZ', 'EG', 'EH', 'ER', 'ET', 'GA', 'GH', 'GM',
-               'GN', 'GQ', 'GW', 'KE', 'KM', 'LR', 'LS', 'LY', 'MA', 'MG',
-               'ML', 'MR', 'MU', 'MW', 'MZ', 'NA', 'NE', 'NG', 'RE', 'RW',
-               'SC', 'SD', 'SL', 'SN', 'SO', 'SS', 'ST', 'SZ', 'TD', 'TG',
-               'TN', 'TZ', 'UG', 'YT', 'ZA', 'ZM', 'ZW'],
-    'North America': ['AG', 'AI', 'AW', 'BB', 'BL', 'BM', 'BQ', 'BS', 'BZ',
-                      'CA', 'CR', 'CU', 'CW', 'DM', 'DO', 'GD', 'GL', 'GP',
-                      'GT', 'HN', 'HT', 'JM', 'KN', 'KY', 'LC', 'MF', 'MQ',
-                      'MS', 'MX', 'NI', 'PA', 'PM', 'PR', 'SV', 'SX', 'TC',
-                      'TT', 'US', 'VC', 'VG', 'VI'],
-    'South America': ['AR', 'BO', 'BR', 'CL', 'CO', 'EC', 'FK', 'GF', 'GY',
-                      'PE', 'PY', 'SR', 'UY', 'VE'],
-    'Oceania': ['AS', 'AU', 'CK', 'FJ', 'FM', 'GU', 'KI', 'MH', 'MP', 'NC',
-                'NF', 'NR', 'NU', 'NZ', 'PF', 'PG', 'PN', 'PW', 'SB', 'TK',
-                'TO', 'TV', 'UM', 'VU', 'WF', 'WS']
-}
+# Each stage is keyed only on the inputs it depends on, so changing a ranking
+# control (min articles, sort, max results) reuses the cached filtering and
+# aggregation. The author name is a filter too: only the works of matching
+# authors are aggregated. Corpora are identified by their content hash.
+# Stages only record timings into _instrumentation when they actually run.
 
-def get_country_name(code):
-    return COUNTRY_CODES.get(code.upper(), code)
+# Number of filter/aggregation results kept per stage
+MAX_CACHED_STAGES = 16
 
-def get_continent(country_code):
-    cc = country_code.upper()
-    for continent, codes in CONTINENT_MAP.items():
-        if cc in codes:
-            return continent
-    return 'Unknown'
+@st.cache_resource(max_entries=MAX_CACHED_STAGES, show_spinner=False)
+def cached_work_ids(content_hash, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors,
+                    _corpus, _instrumentation=None):
+    return filter_works(_corpus, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors,
+                        _instrumentation)
 
-def process_works_to_author_profiles(works, topic_filter=None, journal_filter=None, country_filter=None):
-    """Process works into author profiles with filtering"""
-    author_profiles = defaultdict(lambda: {
-        'count': 0,
-        'citations': [],
-        'topics': Counter(),
-        'coauthors': Counter(),
-        'journals': Counter(),
-        'countries': Counter(),
-        'orcid': '',
-        'openalex_id': '',
-        'display_name': ''
-    })
-    
-    for work in works:
-        citations = work.get('cited_by_count', 0)
-        
-        primary_loc = work.get('primary_location', {})
-        source = primary_loc.get('source', {}) if primary_loc else {}
-        journal = source.get('display_name', 'Unknown')
-        
-        topic = work.get('primary_topic')
-        topic_name = topic.get('display_name', 'Unknown') if topic else 'Unknown'
-        
-        # Apply filters
-        if topic_filter and topic_filter not in topic_name.lower():
-            continue
-        
-        if journal_filter and journal_filter not in journal.lower():
-            continue
-        
-        if country_filter:
-            work_has_country = False
-            for authorship in work.get('authorships', []):
-                countries = authorship.get('countries', [])
-                for country_code in countries:
-                    if country_code:
-                        country_name = get_country_name(country_code).lower()
-                        if country_filter in country_name or country_filter in country_code.lower():
-                            work_has_country = True
-                            break
-                if work_has_country:
-                    break
-            if not work_has_country:
-                continue
-        
-        # Process authors
-        for authorship in work.get('authorships', []):
-            author_info = authorship.get('author', {})
-            author_name = author_info.get('display_name', 'Unknown')
-            
-            if not author_name or author_name == 'Unknown':
-                continue
-            
-            normalized_name = normalize_author_name(author_name)
-            profile = author_profiles[normalized_name]
-            
-            if not profile['display_name']:
-                profile['display_name'] = author_name
-            
-            profile['count'] += 1
-            profile['citations'].append(citations)
-            
-            if author_info.get('orcid') and not profile['orcid']:
-                profile['orcid'] = author_info['orcid']
-            if author_info.get('id') and not profile['openalex_id']:
-                profile['openalex_id'] = author_info['id']
-            
-            if topic_name != 'Unknown':
-                profile['topics'][topic_name] += 1
-            
-            for other_auth in work.get('authorships', []):
-                other_name = other_auth.get('author', {}).get('display_name', '')
-                if other_name and other_name != author_name:
-                    profile['coauthors'][other_name] += 1
-            
-            if journal != 'Unknown':
-                profile['journals'][journal] += 1
-            
-            countries = authorship.get('countries', [])
-            for country_code in countries:
-                if country_code:
-                    profile['countries'][country_code] += 1
-    
-    return author_profiles
+@st.cache_resource(max_entries=MAX_CACHED_STAGES, show_spinner=False)
+def cached_profiles(content_hash, topic_filter, journal_filter, country_filter, author_filter, fuzzy_authors,
+                    coauthor_cap, _corpus, _instrumentation=None):
+    work_ids = cached_work_ids(content_hash, topic_filter, journal_filter, country_filter, author_filter,
+                               fuzzy_authors, _corpus, _instrumentation)
+    return aggregate_author_profiles(_corpus, work_ids, coauthor_cap, instrumentation=_instrumentation)
+
+# Memory budget of the search results shared by all sessions
+RESULT_CACHE_MB = 64
+
+@st.cache_resource(show_spinner=False)
+def result_cache():
+    """Ranked results of recent searches, keyed by (content hash, filters, ranking)"""
+    return ResultCache(RESULT_CACHE_MB * 2**20)
+
+# Number of generated download files kept
+MAX_CACHED_EXPORTS = 8
+
+@st.cache_data(max_entries=MAX_CACHED_EXPORTS, show_spinner=False)
+def cached_export(content_hash, filters, ranking, file_format, _profiles):
+    """Export file bytes for one result set, generated on first download only"""
+    return export_results(iter_results(_profiles, *ranking), file_format)
 
 # ============================================================================
 # STREAMLIT UI
@@ -271,7 +163,7 @@ with st.sidebar:
        - In Excel, run your data fetch
        - Save the Data sheet as JSON
     
-    2. **Upload the JSON file** here
+    2. **Upload the JSON file(s)** here (works repeated across files are counted once)
     
     3. **Enter search criteria** (all optional)
     
@@ -283,18 +175,50 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("**Need help?**  \nContact: your@email.com")
 
-# File upload
-uploaded_file = st.file_uploader(
+# File upload (one export, or several fetch batches searched together)
+uploaded_files = st.file_uploader(
     "Upload your OpenAlex data (JSON format)",
     type=['json'],
-    help="Export your works data from Excel as JSON first"
+    accept_multiple_files=True,
+    help="Export your works data from Excel as JSON first; several files are merged into one corpus"
 )
 
-if uploaded_file:
+# Previously loaded exports can be reopened from their snapshots without uploading
+saved_snapshot = None
+if not uploaded_files and LIST_SAVED_SNAPSHOTS:
+    snapshots = list_snapshots(DEFAULT_SNAPSHOT_DIR)
+    if snapshots:
+        saved_snapshot = st.selectbox(
+            "...or open a previously loaded file",
+            [None] + snapshots,
+            format_func=lambda m: "—" if m is None else f"{m.get('file_name', m['content_hash'][:12])} "
+                                                        f"({m['n_works']:,} works)"
+        )
+
+if uploaded_files or saved_snapshot:
     try:
-        # Load data
-        works = json.load(uploaded_file)
-        st.success(f"✅ Loaded {len(works):,} works from file")
+        # Load data (parsed once per set of files, reused on every rerun)
+        if uploaded_files:
+            progress = st.empty()
+            
+            def show_progress(fraction):
+                fraction = min(fraction, 1.0)
+                progress.progress(fraction, text=f"Loading works... {fraction:.0%}")
+            
+            # Sorted by contents, so the same files in any order give the same corpus
+            hashes = {compute_content_hash(f): f for f in uploaded_files}
+            content_hash = combine_content_hashes(hashes)
+            corpus, load_stats = load_corpus(content_hash, [hashes[h] for h in sorted(hashes)], show_progress)
+            progress.empty()
+            n_files = len(hashes)
+        else:
+            content_hash = saved_snapshot['content_hash']
+            corpus, load_stats = load_corpus(content_hash)
+            n_files = 1
+        
+        duplicates = load_stats.counters.get('duplicate_works_skipped')
+        st.success(f"✅ Loaded {corpus.n_works:,} works from {n_files} file{'s' if n_files > 1 else ''}"
+                   + (f" ({duplicates:,} duplicate works skipped)" if duplicates else ""))
         
         # Search criteria in columns
         col1, col2 = st.columns(2)
@@ -311,6 +235,24 @@ if uploaded_file:
                 placeholder="e.g., Smith",
                 help="Filter authors by name (partial match)"
             )
+            
+            fuzzy_authors = st.checkbox(
+                "Include similar spellings",
+                help="Also match names within a typo or two of each word (e.g. Muller and Mueller), "
+                     "in any word order"
+            )
+            
+            # Matching names as you type
+            author_term = normalize_search_term(author_search)
+            if author_term:
+                name_keys = corpus.author_index.match(author_term, fuzzy_authors)
+                # Show each name as first spelled in the corpus rather than its normalized key
+                author_key = corpus.name_table.author_key
+                display_names = {}
+                for name in np.flatnonzero(np.isin(author_key, name_keys[:5])).tolist():
+                    display_names.setdefault(int(author_key[name]), corpus.authors[name])
+                examples = ', '.join(display_names[key] for key in name_keys[:5].tolist())
+                st.caption(f"{len(name_keys):,} matching names" + (f": {examples}" if examples else ""))
         
         with col2:
             journal_search = st.text_input(
@@ -349,83 +291,60 @@ if uploaded_file:
         with col5:
             sort_by = st.selectbox(
                 "Sort By",
-                ["Count", "Average Citations", "Median Citations", "Score"],
+                list(SORT_KEYS),
                 help="How to sort the results"
             )
         
+        with st.expander("Advanced options"):
+            coauthor_cap = st.number_input(
+                "Co-author Cap",
+                min_value=0,
+                value=DEFAULT_COAUTHOR_CAP,
+                help="For works with more authors than this, only the first authors are counted "
+                     "as co-authors (0 = count every co-author, slow for works with thousands of authors)"
+            )
+            
+            export_all = st.checkbox(
+                "Download all matching authors",
+                help="Include every author matching the search in downloads, not only the top Maximum Results"
+            )
+            
+            track_memory = st.checkbox(
+                "Track peak memory",
+                help="Measure the peak memory of each search stage in the Performance panel (slows searches down)"
+            )
+        
         # Search button
         if st.button("🔍 Search Authors", type="primary"):
             with st.spinner("Processing author profiles..."):
                 
-                # Process works
-                profiles = process_works_to_author_profiles(
-                    works,
-                    topic_filter=topic_search.lower() if topic_search else None,
-                    journal_filter=journal_search.lower() if journal_search else None,
-                    country_filter=country_search.lower() if country_search else None
+                # Reuse the results of an identical search, else filter and
+                # aggregate (cached) and rank
+                author_term = normalize_search_term(author_search)
+                filters = (
+                    normalize_search_term(topic_search),
+                    normalize_search_term(journal_search),
+                    normalize_search_term(country_search),
+                    author_term,
+                    fuzzy_authors,
+                    coauthor_cap or None
                 )
+                search_stats = Instrumentation(track_memory)
                 
-                # Build results
-                results = []
-                for normalized_name, profile in profiles.items():
-                    if profile['count'] < min_articles:
-                        continue
-                    
-                    # Author name filter
-                    if author_search:
-                        display_name = profile['display_name'].lower()
-                        if author_search.lower() not in normalized_name.lower() and author_search.lower() not in display_name:
-                            continue
-                    
-                    citations = profile['citations']
-                    median_cites = sorted(citations)[len(citations)//2] if citations else 0
-                    avg_cites = round(sum(citations) / len(citations), 1) if citations else 0
-                    
-                    most_common_country = profile['countries'].most_common(1)
-                    country_code = most_common_country[0][0] if most_common_country else ''
-                    country_name = get_country_name(country_code)
-                    continent = get_continent(country_code)
-                    
-                    top_topics = ', '.join([t for t, _ in profile['topics'].most_common(5)])
-                    top_coauthors = ', '.join([c for c, _ in profile['coauthors'].most_common(5)])
-                    top_journals = ', '.join([j for j, _ in profile['journals'].most_common(5)])
-                    
-                    # Calculate score
-                    score = 0
-                    if profile['count'] >= 10:
-                        score += 1
-                    if median_cites >= 5:
-                        score += 1
-                    if profile['orcid']:
-                        score += 1
-                    
-                    results.append({
-                        'Author': profile['display_name'],
-                        'Count': profile['count'],
-                        'Median Citations': median_cites,
-                        'Average Citations': avg_cites,
-                        'Country': country_name,
-                        'Continent': continent,
-                        'Top Topics': top_topics,
-                        'Top Co-authors': top_coauthors,
-                        'Top Journals': top_journals,
-                        'ORCID': profile['orcid'] if profile['orcid'] else '',
-                        'OpenAlex ID': profile['openalex_id'] if profile['openalex_id'] else '',
-                        'Score': score
-                    })
-                
-                # Sort results
-                if sort_by == "Count":
-                    results.sort(key=lambda x: x['Count'], reverse=True)
-                elif sort_by == "Average Citations":
-                    results.sort(key=lambda x: x['Average Citations'], reverse=True)
-                elif sort_by == "Median Citations":
-                    results.sort(key=lambda x: x['Median Citations'], reverse=True)
-                elif sort_by == "Score":
-                    results.sort(key=lambda x: (x['Score'], x['Count']), reverse=True)
-                
-                # Limit results
-                results = results[:max_results]
+                results_key = (content_hash, filters, (min_articles, author_term, sort_by, max_results, fuzzy_authors))
+                results = result_cache().get(results_key)
+                if results is None:
+                    search_stats.count('result_cache_misses')
+                    profiles = cached_profiles(content_hash, *filters, corpus, search_stats)
+                    with search_stats.stage('rank'):
+                        results = build_results(profiles, min_articles, author_term, sort_by, max_results,
+                                                fuzzy_authors)
+                    search_stats.count('profiles_ranked', len(profiles))
+                    result_cache().put(results_key, results)
+                else:
+                    search_stats.count('result_cache_hits')
+                search_stats.count('rows_returned', len(results))
+                search_stats.log_counters()
                 
                 if results:
                     st.success(f"✅ Found {len(results)} matching authors")
@@ -451,22 +370,57 @@ if uploaded_file:
                     with col4:
                         st.metric("With ORCID", df['ORCID'].astype(bool).sum())
                     
-                    # Download button
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        df.to_excel(writer, index=False, sheet_name='Author Search Results')
-                    
-                    st.download_button(
-                        label="📥 Download Results (Excel)",
-                        data=output.getvalue(),
-                        file_name="author_search_results.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    # Download buttons (files are only generated when clicked)
+                    ranking = (
+                        min_articles, author_term, sort_by, None if export_all else max_results, fuzzy_authors
                     )
                     
+                    for column, file_format in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS):
+                        with column:
+                            st.download_button(
+                                label=f"📥 Download Results ({'Excel' if file_format == 'xlsx' else file_format.upper()})",
+                                data=lambda file_format=file_format: cached_export(
+                                    content_hash, filters, ranking, file_format,
+                                    cached_profiles(content_hash, *filters, corpus)
+                                ),
+                                file_name=f"author_search_results.{file_format}",
+                                mime=EXPORT_FORMATS[file_format][1],
+                                on_click="ignore"
+                            )
+                    
                 else:
                     st.warning("No authors match your search criteria. Try adjusting your filters.")
+                
+                with st.expander("⏱️ Performance"):
+                    cache = result_cache()
+                    if not search_stats.stages:
+                        st.caption("Results were reused from an identical earlier search.")
+                    elif len(search_stats.stages) == 1:
+                        st.caption("Filtering and aggregation were reused from an earlier search.")
+                    st.caption(
+                        f"Result cache: {cache.hits:,} hits, {cache.misses:,} misses, {len(cache):,} searches "
+                        f"in {cache.size / 2**20:.1f} of {cache.max_bytes / 2**20:.0f} MB"
+                    )
+                    st.dataframe(
+                        pd.DataFrame(
+                            [{'Step': 'Search', **stage} for stage in search_stats.stages] +
+                            [{'Step': 'Load file', **stage} for stage in load_stats.stages]
+                        ).dropna(axis=1, how='all').rename(
+                            columns={'stage': 'Stage', 'seconds': 'Seconds', 'peak_mb': 'Peak Memory (MB)'}
+                        ),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    st.dataframe(
+                        pd.DataFrame(
+                            [{'Counter': name, 'Value': value}
+                             for name, value in (load_stats.counters + search_stats.counters).items()]
+                        ),
+                        use_container_width=True,
+                        hide_index=True
+                    )
     
-    except json.JSONDecodeError:
+    except JSON_ERRORS:
         st.error("❌ Invalid JSON file. Please upload a valid JSON export from Excel.")
     except Exception as e:
         st.error(f"❌ Error processing file: {str(e)}")
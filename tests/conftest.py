@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.synthetic_works import generate_works
+from tests.helpers import compile_works
+
+N_WORKS = 3000
+
+@pytest.fixture(scope='session')
+def works():
+    """A seeded synthetic export, with a few hyper-authored works"""
+    return list(generate_works(N_WORKS, seed=7, hyper_fraction=0.005, hyper_authors=(100, 300)))
+
+@pytest.fixture(scope='session')
+def corpus(works):
+    return compile_works(works)
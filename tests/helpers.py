@@ -0,0 +1,43 @@
+"""Shared corpus helpers for the tests"""
+import json
+from io import BytesIO
+
+import numpy as np
+
+from openalex_author_search import (
+    CorpusBuilder, aggregate_author_profiles, build_results, compile_corpus, filter_works, iter_works
+)
+
+# Search filters exercised against every corpus
+QUERIES = [
+    {},
+    {'topic': 'neural'},
+    {'journal': 'journal of quantum', 'country': 'united states'},
+    {'country': 'de', 'min_articles': 3},
+    {'author': 'garcia'},
+    {'author': 'müller', 'topic': 'cancer'}
+]
+
+def export_bytes(works):
+    return json.dumps(works).encode()
+
+def compile_works(works):
+    return compile_corpus(iter_works(BytesIO(export_bytes(works))))
+
+def search(corpus, query, sort_by, coauthor_cap=None):
+    work_ids = filter_works(corpus, query.get('topic'), query.get('journal'), query.get('country'),
+                            query.get('author'))
+    profiles = aggregate_author_profiles(corpus, work_ids, coauthor_cap)
+    return build_results(profiles, query.get('min_articles', 1), query.get('author'), sort_by)
+
+def assert_same_corpus(a, b):
+    for field in CorpusBuilder.VOCABULARIES:
+        assert getattr(a, field) == getattr(b, field), field
+    for field in ('work_journal', 'work_topic', 'work_citations', 'authorship_offsets', 'authorship_author',
+                  'authorship_orcid', 'authorship_openalex_id', 'country_offsets', 'authorship_country'):
+        assert np.array_equal(getattr(a, field), getattr(b, field)), field
+    for field in ('topic_index', 'journal_index', 'country_index'):
+        assert np.array_equal(getattr(a, field).offsets, getattr(b, field).offsets), field
+        assert np.array_equal(getattr(a, field).postings, getattr(b, field).postings), field
+    assert a.name_table.keys == b.name_table.keys
+    assert np.array_equal(a.name_table.author_key, b.name_table.author_key)
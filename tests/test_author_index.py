@@ -0,0 +1,108 @@
+"""Substring, prefix and fuzzy author name search"""
+import random
+
+import pytest
+
+import openalex_author_search
+from openalex_author_search import (
+    _max_edits, _within_edits, aggregate_author_profiles, build_results, filter_works, normalize_author_name
+)
+from tests.helpers import compile_works
+
+TERMS = [
+    'garcia', 'García', 'muller', 'mueller', 'Müller', 'jose garcia', 'garcia jose', 'gar', 'li', 'wei chen',
+    'chen wei', 'schroder', 'schroeder', 'o’brien', 'van der', 'lukasz', 'j.', 'a', 'kowalsky', 'nunez perez',
+    'perez nunez', 'tanak', 'jean-luc', 'zoe', 'xyz', 'ab cd'
+]
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+def brute_force_match(corpus, term, fuzzy):
+    """Keys matching a term, checked name by name"""
+    term = term.lower()
+    matched = {key for key, name in enumerate(corpus.name_table.keys) if term in name.lower()}
+    matched |= {int(corpus.name_table.author_key[i]) for i, name in enumerate(corpus.authors)
+                if term in name.lower() and corpus.name_table.author_key[i] >= 0}
+    words = openalex_author_search._NAME_WORD.findall(normalize_author_name(term))
+    if fuzzy and words:
+        for key, name in enumerate(corpus.name_table.keys):
+            name_words = openalex_author_search._NAME_WORD.findall(name.lower())
+            if all(any(other.startswith(word) or levenshtein(word, other) <= _max_edits(word)
+                       for other in name_words) for word in words):
+                matched.add(key)
+    return sorted(matched)
+
+def names(corpus, keys):
+    return sorted(corpus.name_table.keys[key] for key in keys.tolist())
+
+@pytest.fixture(scope='module')
+def people():
+    names = ['Hans Muller', 'Anna Mueller', 'Jürgen Müller', 'Mulligan Rose', 'Li Wei', 'Wei Li', 'Lu Wei',
+             'J. Smith', 'Jo Smyth', 'Kate Smithson', 'Ja Smith', 'Nguyen Van Anh']
+    return compile_works([
+        {'id': f'W{i}', 'authorships': [{'author': {'display_name': name}, 'countries': []}]}
+        for i, name in enumerate(names)
+    ])
+
+@pytest.mark.parametrize('term, fuzzy, expected', [
+    ('muller', False, ['Hans Muller', 'Jurgen Muller']),
+    ('muller', True, ['Anna Mueller', 'Hans Muller', 'Jurgen Muller']),
+    ('Mueller', True, ['Anna Mueller', 'Hans Muller', 'Jurgen Muller']),
+    ('müller', False, ['Jurgen Muller']),
+    # Any word order, every word must match
+    ('wei li', True, ['Li Wei', 'Wei Li']),
+    ('smith kate', True, ['Kate Smithson']),
+    ('anh nguyen', True, ['Nguyen Van Anh']),
+    # Prefixes of words
+    ('mul', True, ['Hans Muller', 'Jurgen Muller', 'Mulligan Rose']),
+    ('smi', True, ['J. Smith', 'Ja Smith', 'Kate Smithson']),
+    ('smyth', True, ['J. Smith', 'Ja Smith', 'Jo Smyth']),
+    # Short words and initials allow no edits
+    ('li', True, ['Li Wei', 'Mulligan Rose', 'Wei Li']),
+    ('lu wei', True, ['Lu Wei']),
+    ('jo smith', True, ['Jo Smyth']),
+    ('j smith', True, ['J. Smith', 'Ja Smith', 'Jo Smyth']),
+    ('', True, []),
+    ('.', True, ['J. Smith'])
+])
+def test_match(people, term, fuzzy, expected):
+    assert names(people, people.author_index.match(term, fuzzy)) == expected
+
+@pytest.mark.parametrize('verify_keys', [0, 10**9])
+@pytest.mark.parametrize('fuzzy', [False, True])
+def test_match_agrees_with_brute_force(corpus, monkeypatch, verify_keys, fuzzy):
+    # Both ways of narrowing candidates by further words: checking each key and intersecting posting lists
+    monkeypatch.setattr(openalex_author_search, 'FUZZY_VERIFY_KEYS', verify_keys)
+    for term in TERMS:
+        assert corpus.author_index.match(term, fuzzy).tolist() == brute_force_match(corpus, term, fuzzy), term
+
+def test_within_edits_agrees_with_levenshtein():
+    rng = random.Random(3)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 7)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 7)))
+        for max_edits in (0, 1, 2):
+            assert _within_edits(a, b, max_edits) == (levenshtein(a, b) <= max_edits), (a, b, max_edits)
+
+def test_works_of_keys(people):
+    keys = people.author_index.match('wei', fuzzy=False)
+    assert people.author_index.works(keys).tolist() == [4, 5, 6]
+
+@pytest.mark.parametrize('fuzzy', [False, True])
+@pytest.mark.parametrize('topic', [None, 'neural'])
+def test_author_prefilter_matches_ranking_filter(corpus, topic, fuzzy):
+    everyone = aggregate_author_profiles(corpus, filter_works(corpus, topic))
+    for term in TERMS:
+        term = term.lower()
+        prefiltered = aggregate_author_profiles(corpus, filter_works(corpus, topic, author_filter=term,
+                                                                     fuzzy_authors=fuzzy))
+        for sort_by in ("Count", "Score"):
+            assert build_results(prefiltered, 1, term, sort_by, fuzzy_authors=fuzzy) == \
+                build_results(everyone, 1, term, sort_by, fuzzy_authors=fuzzy), term
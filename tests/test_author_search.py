@@ -0,0 +1,137 @@
+"""Checks of the compiled search pipeline against the original per-work algorithm
+
+The reference below is the loop the Streamlit page used to run over every
+work, with Counter tallies per author, so search results must match it row
+for row, including the order of tied topics and journals. Tied co-authors
+are listed in order of first appearance in the corpus instead of the order
+the loop first credited them.
+"""
+import json
+from collections import Counter, defaultdict
+
+import pytest
+
+from openalex_author_search import (
+    CONTINENT_MAP, SORT_KEYS, get_country_name, normalize_author_name
+)
+from tests.helpers import QUERIES, search
+
+REFERENCE_SORTS = ["Count", "Average Citations", "Median Citations", "Score"]
+
+def reference_profiles(works, topic_filter=None, journal_filter=None, country_filter=None, coauthor_cap=None):
+    """The original process_works_to_author_profiles loop"""
+    author_profiles = defaultdict(lambda: {
+        'count': 0, 'citations': [], 'topics': Counter(), 'coauthors': Counter(), 'journals': Counter(),
+        'countries': Counter(), 'orcid': '', 'openalex_id': '', 'display_name': ''
+    })
+
+    for work in works:
+        citations = work.get('cited_by_count', 0)
+        source = (work.get('primary_location') or {}).get('source') or {}
+        journal = source.get('display_name', 'Unknown')
+        topic = work.get('primary_topic')
+        topic_name = topic.get('display_name', 'Unknown') if topic else 'Unknown'
+
+        if topic_filter and topic_filter not in topic_name.lower():
+            continue
+        if journal_filter and journal_filter not in journal.lower():
+            continue
+        if country_filter and not any(
+            country_filter in get_country_name(code).lower() or country_filter in code.lower()
+            for authorship in work.get('authorships', []) for code in authorship.get('countries', []) if code
+        ):
+            continue
+
+        for authorship in work.get('authorships', []):
+            author_info = authorship.get('author', {})
+            author_name = author_info.get('display_name', 'Unknown')
+            if not author_name or author_name == 'Unknown':
+                continue
+
+            profile = author_profiles[normalize_author_name(author_name)]
+            if not profile['display_name']:
+                profile['display_name'] = author_name
+            profile['count'] += 1
+            profile['citations'].append(citations)
+            if author_info.get('orcid') and not profile['orcid']:
+                profile['orcid'] = author_info['orcid']
+            if author_info.get('id') and not profile['openalex_id']:
+                profile['openalex_id'] = author_info['id']
+            if topic_name != 'Unknown':
+                profile['topics'][topic_name] += 1
+            for other_auth in work.get('authorships', [])[:coauthor_cap]:
+                other_name = other_auth.get('author', {}).get('display_name', '')
+                if other_name and other_name != author_name:
+                    profile['coauthors'][other_name] += 1
+            if journal != 'Unknown':
+                profile['journals'][journal] += 1
+            for country_code in authorship.get('countries', []):
+                if country_code:
+                    profile['countries'][country_code] += 1
+    return author_profiles
+
+def reference_continent(country_code):
+    for continent, codes in CONTINENT_MAP.items():
+        if country_code.upper() in codes:
+            return continent
+    return 'Unknown'
+
+def reference_results(works, query, sort_by, coauthor_cap=None):
+    """The original results loop, plus the H-index and Total Citations columns"""
+    profiles = reference_profiles(works, query.get('topic'), query.get('journal'), query.get('country'),
+                                  coauthor_cap)
+    author_search = query.get('author')
+    name_order = {}
+    for work in works:
+        for authorship in work.get('authorships', []):
+            name_order.setdefault(authorship.get('author', {}).get('display_name', ''), len(name_order))
+    results = []
+    for normalized_name, profile in profiles.items():
+        if profile['count'] < query.get('min_articles', 1):
+            continue
+        if author_search and author_search not in normalized_name.lower() \
+                and author_search not in profile['display_name'].lower():
+            continue
+
+        citations = sorted(profile['citations'])
+        median_cites = citations[len(citations) // 2]
+        country_code = profile['countries'].most_common(1)[0][0] if profile['countries'] else ''
+        results.append({
+            'Author': profile['display_name'],
+            'Count': profile['count'],
+            'Median Citations': median_cites,
+            'Average Citations': round(sum(citations) / len(citations), 1),
+            'H-index': sum(1 for i, c in enumerate(reversed(citations), 1) if c >= i),
+            'Total Citations': sum(citations),
+            'Country': get_country_name(country_code),
+            'Continent': reference_continent(country_code),
+            'Top Topics': ', '.join(t for t, _ in profile['topics'].most_common(5)),
+            'Top Co-authors': ', '.join(sorted(profile['coauthors'], key=lambda c: (
+                -profile['coauthors'][c], name_order[c]
+            ))[:5]),
+            'Top Journals': ', '.join(j for j, _ in profile['journals'].most_common(5)),
+            'ORCID': profile['orcid'],
+            'OpenAlex ID': profile['openalex_id'],
+            'Score': (profile['count'] >= 10) + (median_cites >= 5) + bool(profile['orcid'])
+        })
+
+    if sort_by == "Score":
+        results.sort(key=lambda x: (x['Score'], x['Count']), reverse=True)
+    else:
+        results.sort(key=lambda x: x[sort_by], reverse=True)
+    return results
+
+@pytest.mark.parametrize('sort_by', REFERENCE_SORTS)
+@pytest.mark.parametrize('query', QUERIES, ids=lambda query: json.dumps(query, ensure_ascii=False))
+def test_search_matches_reference(works, corpus, query, sort_by):
+    assert search(corpus, query, sort_by) == reference_results(works, query, sort_by)
+
+@pytest.mark.parametrize('sort_by', ["H-index", "Total Citations"])
+def test_new_sort_keys_match_reference(works, corpus, sort_by):
+    assert search(corpus, {}, sort_by) == reference_results(works, {}, sort_by)
+
+def test_coauthor_cap_matches_reference(works, corpus):
+    assert search(corpus, {}, "Count", coauthor_cap=20) == reference_results(works, {}, "Count", coauthor_cap=20)
+
+def test_sort_keys_are_covered():
+    assert set(SORT_KEYS) == set(REFERENCE_SORTS) | {"H-index", "Total Citations"}
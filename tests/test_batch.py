@@ -0,0 +1,116 @@
+"""Headless batch searches: query files, running and writing results"""
+import csv
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from openalex_author_search import (
+    QUERY_DEFAULTS, RESULT_COLUMNS, aggregate_author_profiles, build_results, filter_works, main, read_queries,
+    run_queries, write_batch_results
+)
+from tests.helpers import export_bytes
+
+def write_lines(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+def test_read_jsonl_queries(tmp_path):
+    path = write_lines(tmp_path / 'queries.jsonl', [
+        '{"id": "neuro", "topic": "Neural", "min_articles": 2, "fuzzy_author": true}',
+        '',
+        '{"author": "garcia", "sort_by": "H-index", "max_results": "0", "journal": null}'
+    ])
+    assert read_queries(path) == [
+        dict(QUERY_DEFAULTS, id='neuro', topic='Neural', min_articles=2, fuzzy_author=True),
+        dict(QUERY_DEFAULTS, id='2', author='garcia', sort_by='H-index', max_results=0)
+    ]
+
+def test_read_csv_queries(tmp_path):
+    path = write_lines(tmp_path / 'queries.csv', [
+        'topic,country,min_articles,fuzzy_author',
+        'neural,,5,yes',
+        ',de,,'
+    ])
+    assert read_queries(path) == [
+        dict(QUERY_DEFAULTS, id='1', topic='neural', min_articles=5, fuzzy_author=True),
+        dict(QUERY_DEFAULTS, id='2', country='de')
+    ]
+
+@pytest.mark.parametrize('line, message', [
+    ('[1, 2]', "expected a JSON object"),
+    ('"abc"', "expected a JSON object"),
+    ('5', "expected a JSON object"),
+    ('{"topik": "neural"}', "unknown fields topik"),
+    ('{"min_articles": "three"}', "min_articles must be an integer, not 'three'"),
+    ('{"coauthor_cap": [5]}', "coauthor_cap must be an integer"),
+    ('{"author": 5}', "author must be a string"),
+    ('{"sort_by": "Fame"}', "sort_by must be one of")
+])
+def test_invalid_queries_are_reported_with_their_number(tmp_path, line, message):
+    path = write_lines(tmp_path / 'queries.jsonl', ['{}', line])
+    with pytest.raises(ValueError, match=f"^Query 2: {message}"):
+        read_queries(path)
+
+def test_extra_csv_values_are_reported(tmp_path):
+    with pytest.raises(ValueError, match="^Query 1: more values than columns"):
+        read_queries(write_lines(tmp_path / 'queries.csv', ['topic', 'neural,extra']))
+
+def test_run_queries_matches_single_searches(corpus):
+    queries = [
+        dict(QUERY_DEFAULTS, id='1', topic='Neural '),
+        dict(QUERY_DEFAULTS, id='2', topic='neural', sort_by='Score', max_results=0, min_articles=1),
+        dict(QUERY_DEFAULTS, id='3', author='García', fuzzy_author=True, coauthor_cap=5)
+    ]
+    results = [(query, list(rows)) for query, rows in run_queries(corpus, queries)]
+    assert [query for query, _ in results] == queries
+    
+    for query, rows in results:
+        topic, author = query['topic'].strip().lower() or None, query['author'].lower() or None
+        work_ids = filter_works(corpus, topic, None, None, author, query['fuzzy_author'])
+        profiles = aggregate_author_profiles(corpus, work_ids, query['coauthor_cap'] or None)
+        assert rows == build_results(profiles, query['min_articles'], author, query['sort_by'],
+                                     query['max_results'] or None, query['fuzzy_author'])
+        assert rows
+
+def batch_results(corpus):
+    queries = [dict(QUERY_DEFAULTS, id='a', max_results=3), dict(QUERY_DEFAULTS, id='b', max_results=2)]
+    return [(query, list(rows)) for query, rows in run_queries(corpus, queries)]
+
+def test_write_batch_results_jsonl(corpus, tmp_path):
+    results = batch_results(corpus)
+    path = str(tmp_path / 'out.jsonl')
+    write_batch_results(results, path)
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [
+            {'Query': query['id'], **row} for query, rows in results for row in rows
+        ]
+
+def test_write_batch_results_csv_and_xlsx(corpus, tmp_path):
+    results = batch_results(corpus)
+    expected = [[query['id']] + [row[column] for column in RESULT_COLUMNS] for query, rows in results for row in rows]
+    
+    write_batch_results(results, str(tmp_path / 'out.csv'))
+    with open(tmp_path / 'out.csv', encoding='utf-8', newline='') as f:
+        assert list(csv.reader(f)) == [['Query'] + RESULT_COLUMNS] + [[str(value) for value in row] for row in expected]
+    
+    write_batch_results(results, str(tmp_path / 'out.XLSX'))
+    sheet = load_workbook(tmp_path / 'out.XLSX', read_only=True).active
+    assert [[value if value is not None else '' for value in row] for row in sheet.values] == \
+        [['Query'] + RESULT_COLUMNS] + expected
+
+def test_command_line(works, tmp_path, capsys):
+    (tmp_path / 'works.json').write_bytes(export_bytes(works[:500]))
+    queries = write_lines(tmp_path / 'queries.jsonl', ['{"id": "all", "min_articles": 1, "max_results": 0}'])
+    output = str(tmp_path / 'out.jsonl')
+    main(['search', str(tmp_path / 'works.json'), queries, '-o', output, '--snapshot-dir', ''])
+    with open(output, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert rows and {row['Query'] for row in rows} == {'all'}
+    assert "Loaded 500 works" in capsys.readouterr().err
+    
+    bad_queries = write_lines(tmp_path / 'bad.jsonl', ['[1, 2]'])
+    with pytest.raises(SystemExit) as exited:
+        main(['search', str(tmp_path / 'works.json'), bad_queries, '-o', output, '--snapshot-dir', ''])
+    assert exited.value.code == 1
+    assert capsys.readouterr().err == "error: Query 1: expected a JSON object\n"
@@ -0,0 +1,33 @@
+"""Country and continent lookup tables"""
+import pytest
+
+from openalex_author_search import (
+    CONTINENT_MAP, COUNTRY_CODES, _match_countries, get_continent, get_country_name, resolve_country_filter
+)
+
+CODES = list(COUNTRY_CODES) + ['us', 'gb', 'XX', 'zz', '']
+
+def reference_continent(country_code):
+    for continent, codes in CONTINENT_MAP.items():
+        if country_code.upper() in codes:
+            return continent
+    return 'Unknown'
+
+def test_continents_match_the_continent_map():
+    for code in CODES:
+        assert get_continent(code) == reference_continent(code), code
+
+def test_country_names():
+    assert get_country_name('de') == 'Germany'
+    assert get_country_name('UK') == get_country_name('GB') == 'United Kingdom'
+    assert get_country_name('XX') == 'XX'
+
+@pytest.mark.parametrize('term', ['united', 'us', 'de', 'germany', 'guinea', 'ic', 'x', 'zz', 'king', 'ô'])
+def test_country_filter_matches_the_per_code_check(term):
+    expected = [i for i, code in enumerate(CODES)
+                if term in get_country_name(code).lower() or term in code.lower()]
+    assert _match_countries(CODES, term) == expected
+
+def test_country_filter_resolves_names_to_codes():
+    assert resolve_country_filter('united kingdom') == {'GB', 'UK'}
+    assert resolve_country_filter('nowhere') == frozenset()
@@ -0,0 +1,61 @@
+"""Downloadable result files"""
+import csv
+import json
+from io import BytesIO, StringIO
+
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+
+from openalex_author_search import (
+    EXPORT_FORMATS, RESULT_COLUMNS, aggregate_author_profiles, export_results, iter_results, write_results_csv,
+    write_results_jsonl, write_results_xlsx
+)
+
+@pytest.fixture(scope='module')
+def results(corpus):
+    profiles = aggregate_author_profiles(corpus, np.arange(corpus.n_works))
+    return list(iter_results(profiles, 2, sort_by="Score"))
+
+def as_text(row):
+    return [str(row[column]) for column in RESULT_COLUMNS]
+
+def test_xlsx_round_trip(results):
+    output = BytesIO()
+    write_results_xlsx(iter(results), output)
+    sheet = load_workbook(BytesIO(output.getvalue()), read_only=True)['Author Search Results']
+    values = [list(row) for row in sheet.values]
+    assert values[0] == RESULT_COLUMNS
+    # Empty strings (such as missing ORCIDs) come back as empty cells
+    assert values[1:] == [[row[column] if row[column] != '' else None for column in RESULT_COLUMNS]
+                          for row in results]
+
+def test_csv_round_trip(results):
+    output = BytesIO()
+    write_results_csv(iter(results), output)
+    reader = csv.reader(StringIO(output.getvalue().decode('utf-8'), newline=''))
+    assert list(reader) == [RESULT_COLUMNS] + [as_text(row) for row in results]
+    # The caller's file is left open
+    assert not output.closed
+
+def test_jsonl_round_trip(results):
+    output = BytesIO()
+    write_results_jsonl(iter(results), output, ['Author', 'Count'])
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        {'Author': row['Author'], 'Count': row['Count']} for row in results
+    ]
+
+def test_non_ascii_names_survive():
+    row = {**dict.fromkeys(RESULT_COLUMNS, ''), 'Author': 'Søren Ødegaard–Núñez', 'Count': 3}
+    csv_rows = list(csv.reader(StringIO(export_results([row], 'csv').decode('utf-8'))))
+    assert csv_rows[1][0] == 'Søren Ødegaard–Núñez'
+    sheet = load_workbook(BytesIO(export_results([row], 'xlsx')), read_only=True).active
+    assert list(sheet.values)[1][0] == 'Søren Ødegaard–Núñez'
+
+@pytest.mark.parametrize('file_format', list(EXPORT_FORMATS))
+def test_export_results_without_rows(file_format):
+    data = export_results(iter([]), file_format)
+    if file_format == 'csv':
+        assert data.decode('utf-8').splitlines() == [','.join(RESULT_COLUMNS)]
+    else:
+        assert [list(row) for row in load_workbook(BytesIO(data), read_only=True).active.values] == [RESULT_COLUMNS]
@@ -0,0 +1,97 @@
+"""Stage timings, peak memory and counters"""
+import json
+import logging
+import threading
+import tracemalloc
+
+from openalex_author_search import Instrumentation, _stage
+
+def allocate(mb):
+    return bytearray(mb * 2**20)
+
+def test_counters_and_stage_records(caplog):
+    instrumentation = Instrumentation()
+    with caplog.at_level(logging.INFO, logger='openalex_author_search'):
+        with instrumentation.stage('parse'):
+            instrumentation.count('works_loaded', 3)
+        instrumentation.count('works_loaded', 2.0)
+        instrumentation.count('files_loaded')
+        instrumentation.log_counters()
+    
+    [record] = instrumentation.stages
+    assert record['stage'] == 'parse' and record['seconds'] >= 0 and record['peak_mb'] is None
+    assert instrumentation.counters == {'works_loaded': 5, 'files_loaded': 1}
+    assert [json.loads(r.getMessage()) for r in caplog.records] == [
+        {'event': 'stage', **record}, {'event': 'counters', 'works_loaded': 5, 'files_loaded': 1}
+    ]
+
+def test_stage_records_failures_too():
+    instrumentation = Instrumentation()
+    try:
+        with instrumentation.stage('parse'):
+            raise ValueError
+    except ValueError:
+        pass
+    assert [record['stage'] for record in instrumentation.stages] == ['parse']
+
+def test_missing_instrumentation_is_a_no_op():
+    with _stage(None, 'parse'):
+        pass
+
+def test_peak_memory():
+    instrumentation = Instrumentation(track_memory=True)
+    with instrumentation.stage('allocate'):
+        allocate(8)
+    with instrumentation.stage('idle'):
+        pass
+    assert instrumentation.stages[0]['peak_mb'] >= 8
+    assert 0 <= instrumentation.stages[1]['peak_mb'] < 1
+    assert not tracemalloc.is_tracing()
+
+def test_overlapping_stages_share_tracing():
+    first, second = Instrumentation(track_memory=True), Instrumentation(track_memory=True)
+    first_stage, second_stage = first.stage('first'), second.stage('second')
+    first_stage.__enter__()
+    second_stage.__enter__()
+    data = allocate(4)
+    first_stage.__exit__(None, None, None)
+    # Still tracing for the second stage, whose reset invalidated the first's peak
+    assert tracemalloc.is_tracing()
+    second_stage.__exit__(None, None, None)
+    del data
+    
+    assert first.stages[0]['peak_mb'] is None
+    assert second.stages[0]['peak_mb'] >= 4
+    assert not tracemalloc.is_tracing()
+
+def test_concurrent_stages_never_record_negative_peaks():
+    barrier = threading.Barrier(4)
+    stages = []
+    
+    def search():
+        instrumentation = Instrumentation(track_memory=True)
+        for _ in range(20):
+            barrier.wait()
+            with instrumentation.stage('search'):
+                allocate(1)
+        stages.extend(instrumentation.stages)
+    
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stages) == 80
+    assert all(stage['peak_mb'] is None or stage['peak_mb'] >= 0 for stage in stages)
+    assert not tracemalloc.is_tracing()
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        instrumentation = Instrumentation(track_memory=True)
+        with instrumentation.stage('allocate'):
+            allocate(2)
+        assert tracemalloc.is_tracing()
+        assert instrumentation.stages[0]['peak_mb'] >= 2
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,37 @@
+"""Streaming JSON exports into slimmed works"""
+from io import BytesIO
+
+import pytest
+
+from openalex_author_search import PROGRESS_EVERY, iter_works, slim_work
+from tests.helpers import export_bytes
+
+def test_slim_work_keeps_only_searched_fields():
+    work = {
+        'id': 'W1', 'title': 'Unused', 'cited_by_count': 4, 'abstract_inverted_index': {'a': [0]},
+        'primary_location': {'source': {'display_name': 'Nature', 'issn': '0028-0836'}, 'is_oa': True},
+        'primary_topic': {'display_name': 'Neural Networks', 'score': 0.9},
+        'authorships': [{'author': {'display_name': 'Ann Lee', 'orcid': None, 'id': 'A1', 'x': 1},
+                         'countries': None, 'institutions': []}]
+    }
+    assert slim_work(work) == {
+        'id': 'W1', 'cited_by_count': 4,
+        'primary_location': {'source': {'display_name': 'Nature'}},
+        'primary_topic': {'display_name': 'Neural Networks'},
+        'authorships': [{'author': {'display_name': 'Ann Lee', 'orcid': None, 'id': 'A1'}, 'countries': []}]
+    }
+
+def test_iter_works_streams_every_work(works):
+    assert list(iter_works(BytesIO(export_bytes(works)))) == [slim_work(work) for work in works]
+
+def test_progress_reports_bytes_read(works):
+    export = export_bytes(works)
+    reported = []
+    assert len(list(iter_works(BytesIO(b'  \n' + export), reported.append))) == len(works)
+    assert len(reported) == len(works) // PROGRESS_EVERY
+    assert reported == sorted(reported) and 0 < reported[-1] <= len(export) + 3
+
+@pytest.mark.parametrize('export', [b'{"item": {"id": "W1"}}', b'[{"id": "W1"}, 2]', b'[1,2', b''])
+def test_exports_must_be_arrays_of_objects(export):
+    with pytest.raises(ValueError):
+        list(iter_works(BytesIO(export)))
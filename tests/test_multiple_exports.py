@@ -0,0 +1,47 @@
+"""Loading several exports into one corpus without duplicate works"""
+import json
+from io import BytesIO
+
+from openalex_author_search import CorpusBuilder, combine_content_hashes, compile_sources, iter_works
+from tests.helpers import assert_same_corpus, compile_works, export_bytes
+
+def test_merge_matches_single_pass(works):
+    # Overlapping parts, one of them repeating works of its own
+    parts = [works[:1200], works[1000:2200] + works[100:150], works[2000:] + works[:10]]
+    builders = []
+    for part in parts:
+        builder = CorpusBuilder()
+        for work in iter_works(BytesIO(json.dumps(part).encode())):
+            builder.add(work)
+        builders.append(builder)
+    merged = builders[0]
+    for builder in builders[1:]:
+        merged.merge(builder)
+
+    assert merged.duplicates == 200 + 200 + 50 + 10
+    assert_same_corpus(merged.build(), compile_works([work for part in parts for work in part]))
+
+def test_duplicate_works_are_skipped(works, corpus):
+    repeated = compile_works(works + works[:500])
+    assert repeated.n_works == len(works)
+    assert_same_corpus(repeated, corpus)
+
+def test_works_without_id_are_kept():
+    work = {'cited_by_count': 3, 'authorships': [{'author': {'display_name': 'Ann Lee'}, 'countries': ['US']}]}
+    assert compile_works([work, work, dict(work, id='W1'), dict(work, id='W1')]).n_works == 3
+
+def test_compile_sources_in_processes_matches_serial(works, tmp_path):
+    paths = []
+    for i, part in enumerate([works[:1500], works[1000:]]):
+        paths.append(str(tmp_path / f'part{i}.json'))
+        with open(paths[-1], 'wb') as f:
+            f.write(export_bytes(part))
+    serial = compile_sources(paths, workers=1)
+    assert_same_corpus(compile_sources(paths, workers=2), serial)
+    assert_same_corpus(compile_sources([export_bytes(works[:1500]), export_bytes(works[1000:])]), serial)
+    assert serial.n_works == len(works)
+
+def test_content_hash_of_a_set_of_exports():
+    assert combine_content_hashes(['b1']) == 'b1'
+    assert combine_content_hashes(['a1', 'b2']) == combine_content_hashes(['b2', 'a1', 'b2'])
+    assert combine_content_hashes(['a1', 'b2']) not in ('a1', 'b2', combine_content_hashes(['a1', 'b3']))
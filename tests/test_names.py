@@ -0,0 +1,28 @@
+"""Author name normalization and interning"""
+import pytest
+
+from benchmarks.synthetic_works import generate_works
+from openalex_author_search import normalize_author_name, normalize_author_names
+
+@pytest.mark.parametrize('name, normalized', [
+    ('José  García', 'Jose Garcia'),
+    # Unicode dashes are folded away before they could become hyphens, as in the original
+    ('Jean‐Luc Núñez–Pérez', 'JeanLuc NunezPerez'),
+    ('Jean-Luc', 'Jean-Luc'),
+    ('  Søren\tØdegaard\n', 'Sren degaard'),
+    ('', ''),
+    ('李 伟', ''),
+])
+def test_normalize_author_name(name, normalized):
+    assert normalize_author_name(name) == normalized
+
+def test_batched_normalization_matches_one_by_one(works):
+    names = [authorship['author'].get('display_name', '') for work in works for authorship in work['authorships']]
+    names += ['', ' ', 'a\tb', 'x\x1cy', 'Zoë Chen', 'Anne‑Marie  ', '李 伟', 'nul\0name']
+    assert normalize_author_names(names) == [normalize_author_name(name) for name in names]
+
+def test_batched_normalization_of_generated_names():
+    names = [authorship['author'].get('display_name', '')
+             for work in generate_works(500, seed=11) for authorship in work['authorships']]
+    assert normalize_author_names(names) == [normalize_author_name(name) for name in names]
+    assert normalize_author_names([]) == []
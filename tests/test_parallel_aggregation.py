@@ -0,0 +1,27 @@
+"""Aggregating author profiles on a thread pool"""
+import numpy as np
+import pytest
+
+from openalex_author_search import aggregate_author_profiles, build_results, filter_works
+
+TALLIES = ('topics', 'journals', 'countries', 'coauthors')
+
+def assert_same_profiles(a, b):
+    assert build_results(a) == build_results(b)
+    for tally in TALLIES:
+        for field in ('offsets', 'items', 'counts'):
+            assert np.array_equal(getattr(getattr(a, tally), field), getattr(getattr(b, tally), field)), tally
+
+@pytest.mark.parametrize('coauthor_cap', [None, 20])
+def test_parallel_aggregation_matches_serial(corpus, coauthor_cap):
+    work_ids = np.arange(corpus.n_works)
+    serial = aggregate_author_profiles(corpus, work_ids, coauthor_cap, workers=1)
+    parallel = aggregate_author_profiles(corpus, work_ids, coauthor_cap, workers=4)
+    assert_same_profiles(parallel, serial)
+
+@pytest.mark.parametrize('n_works', [0, 1, 2])
+def test_parallel_aggregation_of_few_works(corpus, n_works):
+    work_ids = filter_works(corpus, 'neural')[:n_works]
+    serial = aggregate_author_profiles(corpus, work_ids, workers=1)
+    assert (len(serial) == 0) == (n_works == 0)
+    assert_same_profiles(aggregate_author_profiles(corpus, work_ids, workers=3), serial)
@@ -0,0 +1,27 @@
+"""Citation metrics and top-K ranking of author profiles"""
+import numpy as np
+import pytest
+
+from openalex_author_search import SORT_KEYS, aggregate_author_profiles, build_results
+from tests.helpers import compile_works
+
+def authored(name, citations):
+    return {'cited_by_count': citations, 'authorships': [{'author': {'display_name': name}, 'countries': []}]}
+
+@pytest.mark.parametrize('citations, h_index', [
+    ([10, 8, 5, 4, 3], 4), ([0, 0], 0), ([1], 1), ([100], 1), ([3, 3, 3], 3), ([5, 5, 5, 5, 5, 5], 5)
+])
+def test_citation_metrics(citations, h_index):
+    corpus = compile_works([authored('Ann Lee', c) for c in citations] + [authored('Bo Kim', 1)])
+    [row] = build_results(aggregate_author_profiles(corpus, np.arange(corpus.n_works)), author_search='ann')
+    assert (row['Author'], row['Count'], row['H-index']) == ('Ann Lee', len(citations), h_index)
+    assert row['Total Citations'] == sum(citations)
+    assert row['Median Citations'] == sorted(citations)[len(citations) // 2]
+    assert row['Average Citations'] == round(sum(citations) / len(citations), 1)
+
+@pytest.mark.parametrize('sort_by', list(SORT_KEYS))
+def test_max_results_is_a_prefix(corpus, sort_by):
+    profiles = aggregate_author_profiles(corpus, np.arange(corpus.n_works))
+    results = build_results(profiles, sort_by=sort_by)
+    for max_results in (1, 10, 250, len(results)):
+        assert build_results(profiles, sort_by=sort_by, max_results=max_results) == results[:max_results]
@@ -0,0 +1,70 @@
+"""Size-bounded LRU cache of ranked results"""
+import threading
+
+from openalex_author_search import ResultCache, estimate_rows_size, normalize_search_term
+
+def rows(n, author='Ann Lee'):
+    return [{'Author': author, 'Count': i} for i in range(n)]
+
+def test_hits_and_misses():
+    cache = ResultCache()
+    assert cache.get('a') is None
+    cache.put('a', rows(2))
+    assert cache.get('a') == rows(2)
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 1)
+    assert cache.size == estimate_rows_size(rows(2))
+
+def test_least_recently_used_are_evicted_by_size():
+    size = estimate_rows_size(rows(10))
+    cache = ResultCache(3 * size)
+    for key in 'abc':
+        cache.put(key, rows(10))
+    cache.get('a')
+    cache.put('d', rows(10))
+    assert len(cache) == 3 and cache.size == 3 * size
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    
+    # A larger entry evicts as many as it needs to fit
+    assert size < estimate_rows_size(rows(20)) <= 2 * size
+    cache.put('e', rows(20))
+    assert [key for key in 'acde' if cache.get(key) is not None] == ['d', 'e']
+    assert cache.size == size + estimate_rows_size(rows(20))
+
+def test_rows_larger_than_the_cache_are_not_kept():
+    cache = ResultCache(estimate_rows_size(rows(10)))
+    cache.put('a', rows(5))
+    cache.put('b', rows(100))
+    assert cache.get('b') is None and cache.get('a') == rows(5)
+
+def test_replacing_a_key():
+    cache = ResultCache()
+    cache.put('a', rows(10))
+    cache.put('b', rows(1))
+    cache.put('a', rows(3, 'Bo Kim'))
+    assert len(cache) == 2
+    assert cache.get('a') == rows(3, 'Bo Kim')
+    assert cache.size == estimate_rows_size(rows(3, 'Bo Kim')) + estimate_rows_size(rows(1))
+
+def test_concurrent_use_keeps_the_size_consistent():
+    cache = ResultCache(20 * estimate_rows_size(rows(5)))
+    
+    def use(thread):
+        for i in range(500):
+            key = (thread + i) % 40
+            if cache.get(key) is None:
+                cache.put(key, rows(5))
+    
+    threads = [threading.Thread(target=use, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.hits + cache.misses == 2000
+    assert cache.size == len(cache) * estimate_rows_size(rows(5)) <= cache.max_bytes
+
+def test_normalize_search_term():
+    assert normalize_search_term('  Neural Nets ') == 'neural nets'
+    assert normalize_search_term('   ') is None
+    assert normalize_search_term(None) is None
@@ -0,0 +1,52 @@
+"""Memory-mapped corpus snapshots and their pruning"""
+import json
+import os
+
+from openalex_author_search import (
+    SNAPSHOT_VERSION, list_snapshots, load_or_compile_corpus, load_snapshot, prune_snapshots, save_snapshot
+)
+from tests.helpers import QUERIES, assert_same_corpus, compile_works, export_bytes, search
+
+def test_snapshot_round_trip(corpus, tmp_path):
+    directory = str(tmp_path / 'snapshot')
+    save_snapshot(corpus, directory, 'abc123')
+
+    assert load_snapshot(directory, 'other') is None
+    reopened = load_snapshot(directory, 'abc123')
+    assert_same_corpus(reopened, corpus)
+    for query in QUERIES:
+        assert search(reopened, query, "Score") == search(corpus, query, "Score")
+
+def test_outdated_snapshots_are_not_opened(corpus, tmp_path):
+    directory = str(tmp_path / 'snapshot')
+    save_snapshot(corpus, directory, 'abc123')
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump({'version': SNAPSHOT_VERSION - 1, 'content_hash': 'abc123', 'n_works': corpus.n_works}, f)
+    assert load_snapshot(directory, 'abc123') is None
+
+def test_snapshots_are_reopened_by_content_hash(works, tmp_path):
+    snapshot_dir = str(tmp_path)
+    corpus = load_or_compile_corpus('abc123', [export_bytes(works[:100])], snapshot_dir, 'a.json')
+    assert [m['content_hash'] for m in list_snapshots(snapshot_dir)] == ['abc123']
+    # Reopened without reading the sources
+    assert_same_corpus(load_or_compile_corpus('abc123', None, snapshot_dir), corpus)
+
+def test_oldest_snapshots_are_pruned(works, tmp_path):
+    snapshot_dir = str(tmp_path)
+    corpus = compile_works(works[:200])
+    for i, name in enumerate(['c', 'a', 'd', 'b']):
+        save_snapshot(corpus, os.path.join(snapshot_dir, name), name, created=1000 + i)
+    size = sum(entry.stat().st_size for entry in os.scandir(os.path.join(snapshot_dir, 'a')))
+    os.makedirs(os.path.join(snapshot_dir, 'unrelated'))
+
+    assert prune_snapshots(snapshot_dir, 4 * size) == []
+    assert prune_snapshots(snapshot_dir, 2 * size + 1, keep=('c',)) == [os.path.join(snapshot_dir, name)
+                                                                         for name in ('a', 'd')]
+    assert sorted(os.listdir(snapshot_dir)) == ['b', 'c', 'unrelated']
+
+def test_saving_a_snapshot_prunes_the_others(works, tmp_path):
+    snapshot_dir = str(tmp_path)
+    for content_hash in ('old', 'new'):
+        load_or_compile_corpus(content_hash, [export_bytes(works[:100])], snapshot_dir, max_snapshot_bytes=1)
+    # The snapshot just written is kept even when it alone exceeds the budget
+    assert os.listdir(snapshot_dir) == ['new']